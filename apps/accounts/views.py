@@ -45,17 +45,16 @@ class ProfileView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
 
-        context["upcoming_events"] = Event.objects.filter(
-            attendances__user=user,
-            attendances__status="confirmed",
-            dates__start_date__gte=timezone.now(),
-        ).distinct()
-
-        context["past_events"] = Event.objects.filter(
-            attendances__user=user,
-            attendances__status="confirmed",
-            dates__end_date__lt=timezone.now(),
-        ).distinct()
+        now = timezone.now()
+        attending = Event.objects.filter(
+            attendances__user=user, attendances__status="confirmed"
+        )
+        context["upcoming_events"] = attending.filter(
+            next_start_date__gte=now
+        ).order_by("next_start_date")
+        context["past_events"] = attending.filter(last_end_date__lt=now).order_by(
+            "-last_end_date"
+        )
 
         context["total_bookings"] = EventAttendance.objects.filter(
             user=user, status="confirmed"
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.bookings.models import EventAttendance
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recount Event.confirmed_count from EventAttendance rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report events whose stored count is wrong.",
+        )
+
+    def handle(self, *args, **options):
+        confirmed = (
+            EventAttendance.objects.filter(event=OuterRef("pk"), status="confirmed")
+            .order_by()
+            .values("event")
+            .annotate(c=Count("id"))
+            .values("c")
+        )
+        actual = Coalesce(Subquery(confirmed), 0)
+
+        with transaction.atomic():
+            drifted = (
+                Event.objects.select_for_update()
+                .annotate(actual=actual)
+                .exclude(confirmed_count=F("actual"))
+            )
+            rows = list(drifted.values_list("id", "confirmed_count", "actual"))
+            for event_id, stored, counted in rows:
+                self.stdout.write(
+                    f"  event {event_id}: stored {stored}, actual {counted}"
+                )
+
+            if not options["dry_run"]:
+                Event.objects.filter(pk__in=[row[0] for row in rows]).update(
+                    confirmed_count=actual
+                )
+
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(rows)} drifted events."))
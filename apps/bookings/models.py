@@ -1,5 +1,17 @@
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+
+def _adjust_confirmed_count(event_id: int, delta: int) -> None:
+    from apps.events.models import Event
+
+    Event.objects.filter(pk=event_id).update(
+        confirmed_count=Greatest(F("confirmed_count") + delta, 0)
+    )
 
 
 class EventAttendance(models.Model):
@@ -37,6 +49,29 @@ class EventAttendance(models.Model):
     def __str__(self) -> str:
         return f"{self.user.email} - {self.event.title}"
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    EventAttendance.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("status", flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
+            delta = (self.status == "confirmed") - (previous == "confirmed")
+            if delta:
+                _adjust_confirmed_count(self.event_id, delta)
+
+
+@receiver(post_delete, sender=EventAttendance)
+def release_confirmed_seat(sender, instance, **kwargs):
+    # Fires for instance, queryset and cascade deletes alike.
+    if instance.status == "confirmed":
+        _adjust_confirmed_count(instance.event_id, -1)
+
 
 class TicketSale(models.Model):
     user = models.ForeignKey(
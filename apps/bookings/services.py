@@ -1,9 +1,36 @@
+from collections import defaultdict
+
 import requests
 from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.urls import reverse
 
 from apps.bookings.models import EventAttendance, TicketSale
 
+ATTENDEE_PREVIEW_SIZE = 5
+
+
+def attendee_previews(event_ids, limit: int = ATTENDEE_PREVIEW_SIZE) -> dict:
+    position = Window(
+        RowNumber(),
+        partition_by=F("event_id"),
+        order_by=[F("registered_at").asc(), F("id").asc()],
+    )
+    rows = (
+        EventAttendance.objects.filter(event_id__in=event_ids, status="confirmed")
+        .select_related("user")
+        .only("event_id", "user__username", "user__first_name")
+        .annotate(position=position)
+        .filter(position__lte=limit)
+        .order_by("event_id", "position")
+    )
+
+    previews = defaultdict(list)
+    for attendance in rows:
+        previews[attendance.event_id].append(attendance.user)
+    return previews
+
 
 def initiate_payment(request, event, user, customer_phone):
     if not getattr(settings, "KHALTI_SECRET_KEY", None):
@@ -19,7 +19,7 @@ class BookEventView(LoginRequiredMixin, View):
             messages.warning(request, "You have already booked this event.")
             return redirect("event_detail", slug=slug)
 
-        if not event.next_date:
+        if not event.is_upcoming:
             messages.error(
                 request, "This event has no upcoming dates available for booking."
             )
@@ -50,7 +50,7 @@ class BookEventView(LoginRequiredMixin, View):
             messages.warning(request, "You have already booked this event.")
             return redirect("event_detail", slug=slug)
 
-        if not event.next_date:
+        if not event.is_upcoming:
             messages.error(
                 request, "This event has no upcoming dates available for booking."
             )
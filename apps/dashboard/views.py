@@ -1,6 +1,6 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, Prefetch, Q, Sum
+from django.db.models import F, Sum
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404, redirect
 from django.views import View
@@ -8,7 +8,8 @@ from django.views.generic import ListView, TemplateView
 
 from apps.bookings.models import EventAttendance, TicketSale
 from apps.events.models import Event
-from apps.events.similarity import update_event_embedding
+from apps.events.pagination import CursorPaginationMixin
+from apps.jobs.queue import enqueue
 
 
 class OrganizerRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
@@ -48,27 +49,18 @@ class DashboardView(OrganizerRequiredMixin, TemplateView):
         context["total_tickets_sold"] = (
             sales.aggregate(total=Sum("quantity"))["total"] or 0
         )
-        context["total_attendees"] = EventAttendance.objects.filter(
-            event__in=events, status="confirmed"
-        ).count()
-
-        confirmed_attendances = Prefetch(
-            "attendances", EventAttendance.objects.filter(status="confirmed")
-        )
-        context["recent_events"] = (
-            events.prefetch_related("categories", "images", confirmed_attendances)
-            .annotate(
-                confirmed_count=Count(
-                    "attendances", filter=Q(attendances__status="confirmed")
-                )
-            )
-            .order_by("-created_at")[:5]
+        context["total_attendees"] = (
+            events.aggregate(total=Sum("confirmed_count"))["total"] or 0
         )
 
+        context["recent_events"] = events.prefetch_related(
+            "categories", "images"
+        ).order_by("-created_at")[:5]
+
         return context
 
 
-class DashboardBookingsView(OrganizerRequiredMixin, ListView):
+class DashboardBookingsView(OrganizerRequiredMixin, CursorPaginationMixin, ListView):
     template_name = "dashboard/bookings.html"
     context_object_name = "bookings"
     paginate_by = 20
@@ -87,7 +79,7 @@ class DashboardBookingsView(OrganizerRequiredMixin, ListView):
         return (
             queryset.select_related("user", "event", "event__organizer")
             .prefetch_related("event__categories", "event__images")
-            .order_by("-registered_at")
+            .order_by("-registered_at", "id")
         )
 
     def get_context_data(self, **kwargs):
@@ -122,9 +114,7 @@ class DashboardSalesView(OrganizerRequiredMixin, TemplateView):
             .annotate(
                 total_revenue=Sum("sales__total_price"),
                 tickets_sold=Sum("sales__quantity"),
-                attendee_count=Count(
-                    "attendances", filter=Q(attendances__status="confirmed")
-                ),
+                attendee_count=F("confirmed_count"),
             )
             .order_by("-total_revenue")
         )
@@ -172,7 +162,7 @@ class DashboardModerationView(AdminRequiredMixin, TemplateView):
         return context
 
 
-class DashboardPostsView(AdminRequiredMixin, ListView):
+class DashboardPostsView(AdminRequiredMixin, CursorPaginationMixin, ListView):
     template_name = "dashboard/posts.html"
     context_object_name = "all_events"
     paginate_by = 20
@@ -182,7 +172,7 @@ class DashboardPostsView(AdminRequiredMixin, ListView):
             Event.objects.all()
             .select_related("organizer")
             .prefetch_related("categories", "images")
-            .order_by("-created_at")
+            .order_by("-created_at", "id")
         )
 
     def get_context_data(self, **kwargs):
@@ -196,7 +186,7 @@ class ApproveEventView(AdminRequiredMixin, View):
         event = get_object_or_404(Event, id=event_id)
         event.is_approved = True
         event.save()
-        update_event_embedding(event)
+        enqueue("events.reindex", event_id=event.pk, unique=True)
 
         messages.success(request, f"Event '{event.title}' has been approved.")
         return redirect("dashboard_moderation")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q, QuerySet
+
+from .search import on_postgres
+
+MIN_LENGTH = 2
+LIMIT = 5
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class PrefixCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+cache = PrefixCache()
+
+
+def _title_query(words: list[str]) -> SearchQuery:
+    # Every word must start a title word: 'jazz ni' -> 'jazz':*A & 'ni':*A.
+    # The simple config keeps short and stopword prefixes ('an', 'the') that
+    # the stemming config would drop, leaving nothing to match.
+    terms = " & ".join(f"'{word}':*A" for word in words)
+    return SearchQuery(terms, config="simple", search_type="raw")
+
+
+def _title_matches(queryset: QuerySet, words: list[str]) -> QuerySet:
+    if not on_postgres(queryset):
+        # No tsquery here (the SQLite test database): match word starts.
+        for word in words:
+            queryset = queryset.filter(
+                Q(title__istartswith=word) | Q(title__icontains=f" {word}")
+            )
+        return queryset.order_by("-confirmed_count", "title", "id")
+
+    query = _title_query(words)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-confirmed_count", "id")
+    )
+
+
+def suggest(text: str) -> dict:
+    from .models import Event, EventCategory
+
+    prefix = " ".join(text.lower().split())
+    if len(prefix) < MIN_LENGTH:
+        return {"events": [], "locations": [], "categories": []}
+
+    cached = cache.get(prefix)
+    if cached is not None:
+        return cached
+
+    approved = Event.objects.filter(is_approved=True)
+    words = WORD_RE.findall(prefix)
+    events = approved.none()
+    if words:
+        events = _title_matches(approved, words)
+    locations = (
+        approved.filter(location__istartswith=prefix)
+        .order_by("location")
+        .values_list("location", flat=True)
+        .distinct()
+    )
+    categories = EventCategory.objects.filter(name__istartswith=prefix)
+
+    result = {
+        "events": [
+            {"title": title, "slug": slug}
+            for title, slug in events.values_list("title", "slug")[:LIMIT]
+        ],
+        "locations": list(locations[:LIMIT]),
+        "categories": [
+            {"name": name, "slug": slug}
+            for name, slug in categories.values_list("name", "slug")[:LIMIT]
+        ],
+    }
+    cache.set(prefix, result)
+    return result
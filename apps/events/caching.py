@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from django.utils.safestring import mark_safe
+
+from apps.bookings.models import EventAttendance
+
+from . import invalidation
+from .models import Event, EventCategory, EventDate, EventImage
+
+CATALOG_KEY = "catalog:version"
+CATEGORIES_KEY = "categories:version"
+METRIC_NAMES = ("page", "card")
+BUMP_BATCH_SIZE = 200
+
+
+def _event_key(event_id: int) -> str:
+    return f"event:{event_id}:version"
+
+
+# A version is the time of the last change in nanoseconds. That doubles as
+# Last-Modified, and an evicted key reseeded with "now" can never come back
+# as a value that some stale entry was stored under.
+def _versions(keys: list[str]) -> dict[str, int]:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            seed = time.time_ns()
+            found[key] = seed if cache.add(key, seed, None) else cache.get(key, seed)
+    return found
+
+
+def _store_bump(keys) -> None:
+    now = time.time_ns()
+    current = cache.get_many(keys)
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+    if CATEGORIES_KEY in keys:
+        category_catalog.invalidate()
+
+
+def _bump(*keys: str) -> None:
+    _store_bump(keys)
+    invalidation.publish(keys)
+
+
+def apply_remote_bump(keys: list[str] | None) -> None:
+    # Bumps published by other processes, applied on the listener thread. A
+    # shared cache already holds the new versions; a per-process one has to
+    # move its own. None means notifications may have been missed.
+    local = isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+    if keys is None:
+        if local:
+            cache.clear()
+        category_catalog.invalidate()
+    elif local:
+        _store_bump(keys)
+    elif CATEGORIES_KEY in keys:
+        category_catalog.invalidate()
+
+
+def version_time(version: int) -> datetime:
+    return datetime.fromtimestamp(version / 1e9, tz=UTC)
+
+
+def catalog_version() -> int:
+    return _versions([CATALOG_KEY])[CATALOG_KEY]
+
+
+def event_and_catalog_versions(event_id: int) -> tuple[int, int]:
+    found = _versions([_event_key(event_id), CATALOG_KEY])
+    return found[_event_key(event_id)], found[CATALOG_KEY]
+
+
+def event_versions(event_ids) -> dict[int, int]:
+    keys = {event_id: _event_key(event_id) for event_id in event_ids}
+    found = _versions(list(keys.values()))
+    return {event_id: found[key] for event_id, key in keys.items()}
+
+
+def bump_catalog() -> None:
+    transaction.on_commit(lambda: _bump(CATALOG_KEY))
+
+
+def bump_event(event_id: int) -> None:
+    # Every event shows up in some listing, so the catalog moves with it.
+    transaction.on_commit(lambda: _bump(_event_key(event_id), CATALOG_KEY))
+
+
+def bump_events(event_ids) -> None:
+    # Batched so a reindex touching thousands of events stays a handful of
+    # cache writes and NOTIFY payloads well under Postgres' 8000 bytes.
+    keys = [_event_key(event_id) for event_id in event_ids]
+    for start in range(0, len(keys), BUMP_BATCH_SIZE):
+        batch = keys[start : start + BUMP_BATCH_SIZE]
+        transaction.on_commit(lambda batch=batch: _bump(*batch, CATALOG_KEY))
+
+
+def bump_categories() -> None:
+    transaction.on_commit(lambda: _bump(CATEGORIES_KEY, CATALOG_KEY))
+
+
+class CategoryCatalog:
+    # Categories are listed on every explore page and event form but change
+    # rarely. Each process keeps its own copy and compares it against the
+    # shared version at most every CATEGORY_CACHE_CHECK_INTERVAL seconds;
+    # the invalidation listener forces that check as soon as another
+    # process changes a category.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._categories: list[EventCategory] = []
+        self._checked = float("-inf")
+
+    def all(self) -> list[EventCategory]:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= settings.CATEGORY_CACHE_CHECK_INTERVAL:
+                version = _versions([CATEGORIES_KEY])[CATEGORIES_KEY]
+                if version != self._version:
+                    self._categories = list(EventCategory.objects.all())
+                    self._version = version
+                self._checked = now
+            # Callers annotate what they get (event_count), so hand out copies.
+            return [copy.copy(category) for category in self._categories]
+
+    def choices(self, value: str = "pk") -> list[tuple]:
+        return [(getattr(c, value), c.name) for c in self.all()]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked = float("-inf")
+
+
+category_catalog = CategoryCatalog()
+
+
+class CacheMetrics:
+    def __init__(self, flush_every: int = 50):
+        self.flush_every = flush_every
+        self._pending: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self._pending[f"cache-metrics:{name}:hit"] += hits
+            self._pending[f"cache-metrics:{name}:miss"] += misses
+            if sum(self._pending.values()) < self.flush_every:
+                return
+            pending, self._pending = self._pending, Counter()
+        self._flush(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        self._flush(pending)
+
+    def _flush(self, pending: Counter) -> None:
+        # Workers keep local tallies and fold them into shared counters in
+        # batches, so recording a hit is not a cache round trip of its own.
+        for key, amount in pending.items():
+            if not amount:
+                continue
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                if not cache.add(key, amount, None):
+                    cache.incr(key, amount)
+
+    def _keys(self) -> list[str]:
+        return [
+            f"cache-metrics:{name}:{kind}"
+            for name in METRIC_NAMES
+            for kind in ("hit", "miss")
+        ]
+
+    def totals(self) -> dict[str, tuple[int, int]]:
+        counts = cache.get_many(self._keys())
+        return {
+            name: (
+                counts.get(f"cache-metrics:{name}:hit", 0),
+                counts.get(f"cache-metrics:{name}:miss", 0),
+            )
+            for name in METRIC_NAMES
+        }
+
+    def reset(self) -> None:
+        cache.delete_many(self._keys())
+
+
+metrics = CacheMetrics()
+
+
+def render_event_cards(events, request, previews) -> None:
+    # Cards hold nothing user-specific, so one rendering per event version
+    # serves everyone; the attendee preview is only fetched for misses.
+    versions = event_versions([event.pk for event in events])
+    keys = {event.pk: f"card:{event.pk}:{versions[event.pk]}" for event in events}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [event for event in events if keys[event.pk] not in cached]
+    attendees = previews([event.pk for event in missing]) if missing else {}
+    rendered = {}
+    for event in missing:
+        event.attendee_preview = attendees.get(event.pk, [])
+        rendered[keys[event.pk]] = render_to_string(
+            "components/event_card.html", {"event": event}, request=request
+        )
+    if rendered:
+        cache.set_many(rendered, settings.FRAGMENT_CACHE_TTL)
+        cached.update(rendered)
+
+    for event in events:
+        event.card_html = mark_safe(cached[keys[event.pk]])
+    metrics.record("card", hits=len(events) - len(missing), misses=len(missing))
+
+
+def request_digest(request) -> str:
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return hashlib.md5(
+        f"{request.path}?{query}".encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def patch_shared_cache(request, response) -> None:
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        # Browsers revalidate every time; a shared cache (nginx) may reuse the
+        # response for PAGE_SHARED_MAX_AGE seconds, and 0 turns that off.
+        patch_cache_control(
+            response, public=True, max_age=0, s_maxage=settings.PAGE_SHARED_MAX_AGE
+        )
+    patch_vary_headers(response, ["Cookie"])
+
+
+def make_etag(*parts) -> str:
+    text = ":".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(text.encode(), usedforsecurity=False).hexdigest())
+
+
+class ConditionalGetMixin:
+    # get_validators() returns (etag, last_modified) from cache versions and
+    # a few indexed columns, so a matching If-None-Match / If-Modified-Since
+    # answers 304 before any queryset, similarity lookup or template runs.
+    def get_validators(self) -> tuple[str, datetime] | None:
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        validators = None
+        if request.method in ("GET", "HEAD") and not len(get_messages(request)):
+            validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        if request.user.is_authenticated:
+            # Their pages embed a CSRF token, which logging in or out rotates.
+            # Only an ETag that carries it may answer 304, so no Last-Modified.
+            etag = make_etag(
+                etag,
+                request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+                request.session.session_key,
+            )
+            last_modified = None
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            return response
+
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_shared_cache(request, response)
+        return response
+
+
+class SharedCacheMixin:
+    # For pages with no validators of their own that nginx may still
+    # micro-cache for anonymous visitors.
+    def dispatch(self, request, *args, **kwargs):
+        cacheable = request.method in ("GET", "HEAD") and not len(get_messages(request))
+        response = super().dispatch(request, *args, **kwargs)
+        if cacheable and response.status_code == 200:
+            patch_shared_cache(request, response)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    # Whole responses for anonymous GETs, keyed on the path, the normalized
+    # query string and whatever version get_page_version() reports.
+    def get_page_version(self) -> str | None:
+        return str(catalog_version())
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method != "GET"
+            or request.user.is_authenticated
+            or len(get_messages(request))
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        version = self.get_page_version()
+        if version is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = f"page:{request_digest(request)}:{version}"
+
+        entry = cache.get(key)
+        if entry is not None:
+            metrics.record("page", hits=1)
+            content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        metrics.record("page", misses=1)
+        response = super().dispatch(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200 and hasattr(
+            response, "add_post_render_callback"
+        ):
+            response.add_post_render_callback(
+                lambda rendered: self._store_page(request, key, rendered)
+            )
+        return response
+
+    def _store_page(self, request, key, response) -> None:
+        # A page that handed out a CSRF token is tied to this visitor's cookie.
+        if request.META.get("CSRF_COOKIE_NEEDS_UPDATE") or response.cookies:
+            return
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            settings.PAGE_CACHE_TTL,
+        )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    bump_event(instance.pk)
+
+
+@receiver(post_save, sender=EventDate)
+@receiver(post_delete, sender=EventDate)
+@receiver(post_save, sender=EventImage)
+@receiver(post_delete, sender=EventImage)
+@receiver(post_save, sender=EventAttendance)
+@receiver(post_delete, sender=EventAttendance)
+def event_part_changed(sender, instance, **kwargs):
+    bump_event(instance.event_id)
+
+
+@receiver(m2m_changed, sender=Event.categories.through)
+def event_categories_changed(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Event):
+        bump_event(instance.pk)
+    else:
+        bump_catalog()
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+def category_changed(sender, instance, **kwargs):
+    bump_categories()
+
+
+@receiver(request_started)
+def start_invalidation_listener(sender, **kwargs):
+    invalidation.start(apply_remote_bump)
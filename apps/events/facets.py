@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, QuerySet
+from django.utils import timezone
+
+from .pagination import queryset_digest
+
+PRICE_BUCKETS = {
+    "under-500": ("Under Rs. 500", Q(ticket_price__gt=0, ticket_price__lt=500)),
+    "500-2000": ("Rs. 500 to 2,000", Q(ticket_price__gte=500, ticket_price__lt=2000)),
+    "over-2000": ("Rs. 2,000 and up", Q(ticket_price__gte=2000)),
+}
+
+
+def _midnight(day) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def date_windows() -> dict[str, tuple[str, Q]]:
+    # next_start_date is always upcoming, so only the far edge is needed;
+    # calendar boundaries keep the filters (and cache keys) stable all day.
+    today = timezone.localdate()
+    week_end = today + timedelta(days=7 - today.weekday())
+    month_end = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return {
+        "week": ("This week", Q(next_start_date__lt=_midnight(week_end))),
+        "month": ("This month", Q(next_start_date__lt=_midnight(month_end))),
+    }
+
+
+def _count(condition: Q) -> Count:
+    return Count("pk", filter=condition, distinct=True)
+
+
+def facet_counts(queryset: QuerySet, filters: dict[str, Q], categories) -> dict:
+    # queryset carries every filter except the faceted groups in filters
+    # (category, free, price, when). An option's count applies the other
+    # groups but not its own, so it says how many results picking it gives.
+    from .models import Event
+
+    categories = list(categories)
+    windows = date_windows()
+    key = "facets:{}:{}:{}:{}".format(
+        queryset_digest(queryset),
+        hashlib.md5(
+            repr(sorted(filters.items())).encode(), usedforsecurity=False
+        ).hexdigest(),
+        ",".join(str(category.pk) for category in categories),
+        timezone.localdate().isoformat(),
+    )
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    def others(group: str) -> Q:
+        condition = Q()
+        for name, other in filters.items():
+            if name != group:
+                condition &= other
+        return condition
+
+    # Every facet is a filtered COUNT(DISTINCT) over the same base rows, so
+    # one statement covers them all whatever the filter state is.
+    matching = Event.objects.filter(pk__in=queryset.order_by().values("pk"))
+    aggregates = {
+        "free": _count(Q(ticket_price=0) & others("free")),
+    }
+    for category in categories:
+        aggregates[f"category_{category.pk}"] = _count(
+            Q(categories=category.pk) & others("category")
+        )
+    for name, (_, condition) in PRICE_BUCKETS.items():
+        aggregates[f"price_{name}"] = _count(condition & others("price"))
+    for name, (_, condition) in windows.items():
+        aggregates[f"when_{name}"] = _count(condition & others("when"))
+    counts = matching.aggregate(**aggregates)
+
+    facets = {
+        "free": counts["free"],
+        "categories": {
+            category.pk: counts[f"category_{category.pk}"] for category in categories
+        },
+        "price": [
+            (name, label, counts[f"price_{name}"])
+            for name, (label, _) in PRICE_BUCKETS.items()
+        ],
+        "when": [
+            (name, label, counts[f"when_{name}"])
+            for name, (label, _) in windows.items()
+        ],
+    }
+    cache.set(key, facets, settings.FACET_CACHE_TTL)
+    return facets
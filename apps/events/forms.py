@@ -4,7 +4,8 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
-from .models import Event, EventCategory, EventDate, EventImage
+from .caching import category_catalog
+from .models import Event, EventDate, EventImage
 
 
 class EventForm(forms.ModelForm):
@@ -35,6 +36,11 @@ class EventForm(forms.ModelForm):
             "categories": forms.CheckboxSelectMultiple(),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Render from the category cache; validation still checks the queryset.
+        self.fields["categories"].choices = category_catalog.choices()
+
     def clean_new_categories(self):
         new_cats = self.cleaned_data.get("new_categories", "")
 
@@ -211,6 +217,4 @@ class EventFilterForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["category"].choices = [
-            (c.slug, c.name) for c in EventCategory.objects.all()
-        ]
+        self.fields["category"].choices = category_catalog.choices("slug")
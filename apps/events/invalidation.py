@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# Seconds of silence after which the listener pings its connection, so a
+# dropped link is noticed and re-established instead of waiting forever.
+IDLE_TIMEOUT = 30
+MAX_RETRY_SECONDS = 30
+# With the pid, identifies this process in its own notifications. PIDs alone
+# repeat across containers (every web container is pid 1).
+NODE = uuid.uuid4().hex
+
+Handler = Callable[[list[str] | None], None]
+
+_started_in: int | None = None
+_start_lock = threading.Lock()
+
+
+def _enabled(connection) -> bool:
+    return settings.CACHE_INVALIDATION_BUS and connection.vendor == "postgresql"
+
+
+def _origin() -> str:
+    return f"{NODE}:{os.getpid()}"
+
+
+def publish(keys: Iterable[str]) -> None:
+    # Called after commit: NOTIFY in autocommit is delivered right away.
+    connection = connections[DEFAULT_DB_ALIAS]
+    if not _enabled(connection):
+        return
+    payload = json.dumps({"origin": _origin(), "keys": list(keys)})
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    except DatabaseError:
+        # Other processes still catch up through their own version checks.
+        logger.warning("Could not publish cache invalidation", exc_info=True)
+
+
+def deliver(payloads: Iterable[str], handler: Handler) -> None:
+    origin = _origin()
+    for payload in payloads:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation %r", payload)
+            continue
+        if message.get("origin") != origin:
+            handler(message.get("keys") or [])
+
+
+class Listener(threading.Thread):
+    def __init__(self, handler: Handler):
+        super().__init__(name="cache-invalidation", daemon=True)
+        self.handler = handler
+        self.delay = 1
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.warning(
+                    "Cache invalidation listener lost its connection; retrying in %ds",
+                    self.delay,
+                    exc_info=True,
+                )
+            finally:
+                connections[DEFAULT_DB_ALIAS].close()
+            time.sleep(self.delay)
+            self.delay = min(self.delay * 2, MAX_RETRY_SECONDS)
+
+    def listen(self) -> None:
+        # This thread gets its own Django connection, kept in autocommit so
+        # notifications arrive as soon as the publishing transaction commits.
+        connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        raw = connection.connection
+        self.delay = 1
+        # Anything published while we were not listening is lost.
+        self.handler(None)
+
+        while True:
+            if select.select([raw], [], [], IDLE_TIMEOUT) == ([], [], []):
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                continue
+            raw.poll()
+            payloads = [notify.payload for notify in raw.notifies]
+            raw.notifies.clear()
+            deliver(payloads, self.handler)
+
+
+def start(handler: Handler) -> None:
+    # Threads do not survive a fork, so a forked worker starts its own.
+    global _started_in
+    if _started_in == os.getpid():
+        return
+    with _start_lock:
+        if _started_in == os.getpid():
+            return
+        if _enabled(connections[DEFAULT_DB_ALIAS]):
+            Listener(handler).start()
+        _started_in = os.getpid()
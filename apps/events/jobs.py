@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.jobs.queue import enqueue, job
+
+from .caching import bump_event
+from .models import Event, EventImage, refresh_event_dates
+from .services import ImageService
+from .similarity import (
+    deleted_event_state,
+    forget_deleted_event,
+    update_event_embedding,
+)
+
+
+@job("events.reindex")
+def reindex_event(event_id: int) -> None:
+    event = Event.objects.filter(pk=event_id).first()
+    if event is not None:
+        update_event_embedding(event)
+
+
+@job("events.forget")
+def forget_event(term_ids: list[int], refill: list[int]) -> None:
+    forget_deleted_event(term_ids, refill)
+
+
+@receiver(pre_delete, sender=Event)
+def collect_deleted_event(sender, instance, **kwargs):
+    instance._similarity_state = deleted_event_state(instance)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    # Covers owner, moderator and admin deletes alike; the job is created in
+    # the deleting transaction, so a rollback takes it with it.
+    state = getattr(instance, "_similarity_state", None)
+    if state and (state["term_ids"] or state["refill"]):
+        enqueue(forget_event, **state)
+
+
+@job("events.process_image")
+def process_event_image(image_id: int) -> None:
+    image = EventImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return
+
+    original = image.image.name
+    processed = ImageService.downscale_image(image.image)
+    if processed is image.image:
+        return
+
+    image.image.save(processed.name, processed, save=False)
+    EventImage.objects.filter(pk=image.pk).update(image=image.image.name)
+    # Only once the row points at the new file; a rollback keeps the original.
+    storage = image.image.storage
+    transaction.on_commit(lambda: storage.delete(original))
+    bump_event(image.event_id)
+
+
+@job("events.roll_dates")
+def roll_event_dates() -> None:
+    # Move next_start_date past occurrences that have started, then run
+    # again after the interval; unique keeps a single chain pending.
+    now = timezone.now()
+    stale = list(
+        Event.objects.filter(next_start_date__lt=now).values_list("pk", flat=True)
+    )
+    refresh_event_dates(Event.objects.filter(pk__in=stale))
+    for event_id in stale:
+        bump_event(event_id)
+    enqueue(
+        roll_event_dates,
+        run_at=now + timedelta(seconds=settings.EVENT_DATE_ROLL_INTERVAL),
+        unique=True,
+    )
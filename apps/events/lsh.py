@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+# Hyperplanes are derived from (SEED, term id), so they never need to be
+# stored and new terms get a projection without touching existing buckets.
+SEED = 7_919
+BATCH_SIZE = 2000
+
+
+@lru_cache(maxsize=65_536)
+def _projection(term: int, width: int) -> np.ndarray:
+    return np.random.default_rng((SEED, term)).standard_normal(width, dtype=np.float32)
+
+
+def signature(vector: dict[str, float], tables: int, bits: int) -> list[int]:
+    width = tables * bits
+    total = np.zeros(width, dtype=np.float32)
+    for term, weight in vector.items():
+        total += weight * _projection(int(term), width)
+
+    signs = (total > 0).reshape(tables, bits).astype(np.int64)
+    powers = 1 << np.arange(bits, dtype=np.int64)
+    return [int(bucket) for bucket in signs @ powers]
+
+
+def event_signature(vector) -> list[int]:
+    if not isinstance(vector, dict) or not vector:
+        return []
+    return signature(
+        vector, settings.SIMILARITY_LSH_TABLES, settings.SIMILARITY_LSH_BITS
+    )
+
+
+def _bucket_rows(event_id: int, vector) -> list:
+    from .models import EventLSHBucket
+
+    return [
+        EventLSHBucket(event_id=event_id, table=table, bucket=bucket)
+        for table, bucket in enumerate(event_signature(vector))
+    ]
+
+
+def update_event_buckets(event) -> None:
+    from .models import EventLSHBucket
+
+    with transaction.atomic():
+        EventLSHBucket.objects.filter(event_id=event.pk).delete()
+        if event.is_approved:
+            EventLSHBucket.objects.bulk_create(_bucket_rows(event.pk, event.embedding))
+
+
+def rebuild_buckets() -> int:
+    from .models import Event, EventLSHBucket
+
+    rows = Event.objects.filter(is_approved=True, embedding__isnull=False)
+    total = 0
+
+    with transaction.atomic():
+        EventLSHBucket.objects.all().delete()
+
+        batch = []
+        for event_id, vector in rows.values_list("id", "embedding").iterator(
+            chunk_size=BATCH_SIZE
+        ):
+            batch.extend(_bucket_rows(event_id, vector))
+            if len(batch) >= BATCH_SIZE:
+                EventLSHBucket.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        EventLSHBucket.objects.bulk_create(batch)
+        total += len(batch)
+
+    return total
+
+
+def candidate_ids(vector) -> set[int]:
+    from .models import EventLSHBucket
+
+    buckets = event_signature(vector)
+    if not buckets:
+        return set()
+
+    matches = Q()
+    for table, bucket in enumerate(buckets):
+        matches |= Q(table=table, bucket=bucket)
+
+    return set(
+        EventLSHBucket.objects.filter(matches).values_list("event_id", flat=True)
+    )
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from apps.events import autocomplete
+from apps.events.models import Event, EventCategory
+from apps.events.synthetic import create_synthetic_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent autocomplete requests with a skewed prefix mix and "
+        "report latency percentiles against a p99 target."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--prefixes",
+            type=int,
+            default=300,
+            help="Number of distinct prefixes; popularity follows a Zipf curve.",
+        )
+        parser.add_argument("--p99-target-ms", type=float, default=50.0)
+        parser.add_argument(
+            "--url",
+            help="Benchmark a running server (e.g. http://localhost:8000) "
+            "instead of the in-process handler.",
+        )
+        parser.add_argument(
+            "--create",
+            type=int,
+            default=0,
+            help="Insert this many synthetic events first and delete them after.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["create"]:
+            create_synthetic_events(options["create"], seed=options["seed"])
+        try:
+            self._benchmark(options)
+        finally:
+            if options["create"]:
+                seeded = f"synthetic-{options['seed']}-"
+                Event.objects.filter(slug__startswith=seeded).delete()
+                EventCategory.objects.filter(slug__startswith="synthetic-").delete()
+
+    def _benchmark(self, options):
+        rng = random.Random(options["seed"])
+        pool = self._prefix_pool(rng, options["prefixes"])
+        if not pool:
+            raise CommandError("No approved events to build prefixes from.")
+
+        weights = [1 / (rank + 1) for rank in range(len(pool))]
+        queries = rng.choices(pool, weights=weights, k=options["requests"])
+        shards = [
+            queries[i :: options["concurrency"]] for i in range(options["concurrency"])
+        ]
+
+        autocomplete.cache.clear()
+        autocomplete.cache.hits = autocomplete.cache.misses = 0
+        path = reverse("explore_autocomplete")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = executor.map(
+                lambda shard: self._run(shard, path, options), shards
+            )
+            timings = [ms for shard in results for ms in shard]
+        elapsed = time.perf_counter() - started
+
+        cuts = statistics.quantiles(timings, n=100)
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        self.stdout.write(
+            f"{len(timings)} requests, {options['concurrency']} concurrent, "
+            f"{len(pool)} prefixes: {len(timings) / elapsed:.0f} req/s"
+        )
+        self.stdout.write(f"p50 {p50:.1f}ms  p95 {p95:.1f}ms  p99 {p99:.1f}ms")
+        if not options["url"]:
+            cache = autocomplete.cache
+            total = max(cache.hits + cache.misses, 1)
+            self.stdout.write(f"prefix cache hit rate {cache.hits / total:.1%}")
+
+        if p99 > options["p99_target_ms"]:
+            raise CommandError(
+                f"p99 {p99:.1f}ms exceeds the {options['p99_target_ms']:.0f}ms target."
+            )
+        self.stdout.write(self.style.SUCCESS("Within the p99 target."))
+
+    def _prefix_pool(self, rng, size):
+        words = set()
+        titles = Event.objects.filter(is_approved=True).values_list("title", "location")
+        for title, location in titles[:5000]:
+            words.update(w.lower() for w in title.split() if len(w) > 2)
+            words.add(location.lower())
+        words.update(
+            name.lower()
+            for name in EventCategory.objects.values_list("name", flat=True)
+        )
+
+        prefixes = {w[: rng.randint(2, min(len(w), 6))] for w in words}
+        return rng.sample(sorted(prefixes), min(size, len(prefixes)))
+
+    def _run(self, queries, path, options):
+        timings = []
+        if options["url"]:
+            base = options["url"].rstrip("/") + path
+            for q in queries:
+                started = time.perf_counter()
+                with urlopen(f"{base}?{urlencode({'q': q})}") as response:
+                    response.read()
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings
+
+        host = next(
+            (h for h in settings.ALLOWED_HOSTS if h not in ("*", "")), "localhost"
+        )
+        client = Client(HTTP_HOST=host.lstrip("."))
+        try:
+            for q in queries:
+                started = time.perf_counter()
+                response = client.get(path, {"q": q})
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"{path}?q={q} returned {response.status_code}")
+        finally:
+            connections.close_all()
+        return timings
@@ -0,0 +1,63 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.events.similarity import REBUILD_BATCH_SIZE, compose_event_text, compute_idf
+from apps.events.synthetic import synthetic_events
+from apps.events.vectorize import document_frequencies, vectorize
+
+
+class Command(BaseCommand):
+    help = (
+        "Time document-frequency counting and vectorization of a synthetic "
+        "corpus for several worker counts."
+    )
+
+    def add_arguments(self, parser):
+        cores = os.cpu_count() or 1
+        parser.add_argument("--events", type=int, default=50_000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=sorted({1, 2, 4, cores}),
+        )
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        texts = [
+            (i, compose_event_text(e.title, e.categories, e.description, e.location))
+            for i, e in enumerate(synthetic_events(options["events"], options["seed"]))
+        ]
+        size = options["batch_size"]
+        batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+
+        self.stdout.write(
+            f"{len(texts)} events in {len(batches)} batches, "
+            f"{os.cpu_count()} cores available"
+        )
+        self.stdout.write(
+            f"{'workers':>7} {'count s':>8} {'vector s':>9} {'total s':>8} "
+            f"{'speedup':>8}"
+        )
+
+        baseline = None
+        for workers in options["workers"]:
+            started = time.perf_counter()
+            vocab = document_frequencies(batches, workers)
+            counted = time.perf_counter()
+
+            term_ids = {token: i for i, token in enumerate(sorted(vocab))}
+            idf = compute_idf(vocab, len(texts))
+            written = sum(len(v) for v in vectorize(batches, idf, term_ids, workers))
+            finished = time.perf_counter()
+
+            assert written == len(texts)
+            total = finished - started
+            baseline = baseline or total
+            self.stdout.write(
+                f"{workers:>7} {counted - started:>8.2f} {finished - counted:>9.2f} "
+                f"{total:>8.2f} {baseline / total:>7.2f}x"
+            )
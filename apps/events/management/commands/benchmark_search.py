@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Greatest
+
+from apps.events.models import Event
+from apps.events.search import search_events
+from apps.events.synthetic import LOCATIONS, TOPICS, create_synthetic_events
+
+
+def _legacy_search(queryset, text):
+    return (
+        queryset.annotate(
+            similarity=Greatest(
+                TrigramSimilarity("title", text),
+                TrigramSimilarity("location", text),
+                TrigramSimilarity("description", text),
+            )
+        )
+        .filter(similarity__gte=0.12)
+        .order_by("-similarity")
+    )
+
+
+def _typo(word, rng):
+    i = rng.randrange(len(word))
+    return word[:i] + word[i + 1 :]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare explore search strategies on a large synthetic table inside a "
+        "rolled-back transaction (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--page-size", type=int, default=12)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print EXPLAIN ANALYZE for the first query of each mode.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("benchmark_search needs PostgreSQL.")
+
+        rng = random.Random(options["seed"])
+        words = [w for topic in TOPICS.values() for w in topic if len(w) > 3]
+        words += [location.lower() for location in LOCATIONS]
+        terms = [rng.choice(words) for _ in range(options["queries"])]
+        typos = [_typo(term, rng) for term in terms]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            create_synthetic_events(options["events"], seed=options["seed"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE events_event")
+            self.stdout.write(
+                f"Seeded {options['events']} events in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+
+            base = Event.objects.filter(is_approved=True)
+            modes = [
+                ("trigram (before)", _legacy_search, terms),
+                ("full-text", search_events, terms),
+                ("typo fallback", search_events, typos),
+            ]
+
+            self.stdout.write(
+                f"{'mode':<18} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'hits':>6}"
+            )
+            for label, search, queries in modes:
+                self._run(label, search, base, queries, options)
+
+            transaction.set_rollback(True)
+
+    def _run(self, label, search, base, queries, options):
+        timings = []
+        hits = 0
+        for text in queries:
+            started = time.perf_counter()
+            page = list(search(base, text)[: options["page_size"]])
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += bool(page)
+
+        cuts = statistics.quantiles(timings, n=20)
+        p50, p95 = cuts[9], cuts[18]
+        self.stdout.write(
+            f"{label:<18} {statistics.mean(timings):>8.1f} {p50:>8.1f} "
+            f"{p95:>8.1f} {hits:>6}"
+        )
+
+        if options["explain"]:
+            plan = search(base, queries[0])[: options["page_size"]].explain(
+                analyze=True
+            )
+            self.stdout.write(plan + "\n")
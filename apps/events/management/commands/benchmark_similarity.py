@@ -0,0 +1,176 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.events.models import Event
+from apps.events.services import SimilarityService
+from apps.events.similarity import (
+    build_event_text,
+    build_vocabulary,
+    compute_idf,
+    compute_similar_events,
+    get_similar_events,
+    rebuild_all_embeddings,
+    text_to_vector,
+)
+from apps.events.synthetic import create_synthetic_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the similarity pipeline on synthetic catalogs and print "
+        "wall time, peak memory and query counts as JSON. Everything runs in "
+        "a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Number of events to look up per request-path stage.",
+        )
+        parser.add_argument(
+            "--legacy-limit",
+            type=int,
+            default=10_000,
+            help="Skip the SimilarityService full scan above this size.",
+        )
+        parser.add_argument(
+            "--no-memory",
+            action="store_true",
+            help="Disable tracemalloc, which slows Python-heavy stages down.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write JSON here instead of stdout.")
+        parser.add_argument(
+            "--allow-existing",
+            action="store_true",
+            help="Run even if the database already contains events.",
+        )
+
+    def handle(self, *args, **options):
+        if Event.objects.exists() and not options["allow_existing"]:
+            raise CommandError(
+                "The database already has events, which would skew the results. "
+                "Use an empty database or pass --allow-existing."
+            )
+
+        self.track_memory = not options["no_memory"]
+        results = []
+        for size in options["sizes"]:
+            with transaction.atomic():
+                results.extend(self._run_size(size, options))
+                transaction.set_rollback(True)
+
+        report = {
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def _run_size(self, size, options):
+        results = []
+
+        def record(stage, measured, **extra):
+            results.append({"size": size, "stage": stage, **measured, **extra})
+            self.stderr.write(
+                f"{size:>7} {stage:<18} {measured['wall_s']:>8.3f}s "
+                f"{measured['peak_mb'] or 0:>8.1f}MB {measured['queries']:>6}q"
+            )
+
+        with self._measure() as measured:
+            create_synthetic_events(size, seed=options["seed"])
+        record("seed", measured)
+
+        events = list(
+            Event.objects.filter(is_approved=True).prefetch_related("categories")
+        )
+        texts = [build_event_text(event) for event in events]
+
+        with self._measure() as measured:
+            vocab = build_vocabulary(texts)
+        record("vocabulary", measured, terms=len(vocab))
+
+        term_ids = {token: i for i, token in enumerate(sorted(vocab))}
+        idf = compute_idf(vocab, len(texts))
+        with self._measure() as measured:
+            for text in texts:
+                text_to_vector(text, idf, term_ids)
+        record("vectorize", measured)
+
+        del events, texts
+        with self._measure() as measured:
+            rebuild_all_embeddings()
+        record("rebuild", measured)
+
+        rng = random.Random(options["seed"])
+        ids = list(Event.objects.values_list("id", flat=True))
+        sample = rng.sample(ids, min(options["requests"], len(ids)))
+        lookups = list(Event.objects.filter(pk__in=sample))
+
+        with self._measure() as measured:
+            for event in lookups:
+                for similar in get_similar_events(event):
+                    list(similar.images.all())
+        record("get_similar_events", measured, **self._per_request(measured, lookups))
+
+        with self._measure() as measured:
+            for event in lookups:
+                compute_similar_events(event)
+        record("live_scan", measured, **self._per_request(measured, lookups))
+
+        if size <= options["legacy_limit"]:
+            with self._measure() as measured:
+                for event in lookups:
+                    list(SimilarityService.get_similar_events(event))
+            record("legacy_service", measured, **self._per_request(measured, lookups))
+
+        return results
+
+    def _per_request(self, measured, lookups):
+        count = max(len(lookups), 1)
+        return {
+            "requests": len(lookups),
+            "ms_per_request": measured["wall_s"] * 1000 / count,
+            "queries_per_request": measured["queries"] / count,
+        }
+
+    @contextmanager
+    def _measure(self):
+        measured = {}
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        if self.track_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count):
+                yield measured
+        finally:
+            measured["wall_s"] = time.perf_counter() - started
+            measured["queries"] = queries
+            measured["peak_mb"] = None
+            if self.track_memory:
+                measured["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.events.caching import catalog_version, metrics
+
+
+class Command(BaseCommand):
+    help = "Show hit rates for the anonymous page cache and event card cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Zero the counters afterwards."
+        )
+
+    def handle(self, *args, **options):
+        metrics.flush()
+        self.stdout.write(f"{'cache':<8} {'hits':>10} {'misses':>10} {'hit rate':>9}")
+        for name, (hits, misses) in metrics.totals().items():
+            rate = hits / (hits + misses) if hits + misses else 0.0
+            self.stdout.write(f"{name:<8} {hits:>10} {misses:>10} {rate:>9.1%}")
+        self.stdout.write(f"catalog version {catalog_version()}")
+
+        if options["reset"]:
+            metrics.reset()
@@ -0,0 +1,96 @@
+import heapq
+import random
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from apps.events.lsh import signature
+from apps.events.similarity import (
+    MIN_SIMILARITY,
+    build_vocabulary,
+    compose_event_text,
+    compute_idf,
+    cosine_similarity,
+    text_to_vector,
+)
+from apps.events.synthetic import synthetic_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare LSH candidate recall against exact cosine similarity on a "
+        "synthetic corpus, for a grid of table/bit settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=5000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--k", type=int, default=8)
+        parser.add_argument("--tables", type=int, nargs="+", default=[8, 16, 32])
+        parser.add_argument("--bits", type=int, nargs="+", default=[4, 6, 8])
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        k = options["k"]
+        texts = [
+            compose_event_text(e.title, e.categories, e.description, e.location)
+            for e in synthetic_events(options["events"], seed=options["seed"])
+        ]
+        vocab = build_vocabulary(texts)
+        term_ids = {token: i for i, token in enumerate(sorted(vocab))}
+        idf = compute_idf(vocab, len(texts))
+        vectors = [text_to_vector(text, idf, term_ids) for text in texts]
+
+        rng = random.Random(options["seed"])
+        queries = rng.sample(range(len(vectors)), min(options["queries"], len(vectors)))
+
+        started = time.perf_counter()
+        exact = {q: self._top(q, range(len(vectors)), vectors, k) for q in queries}
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        self.stdout.write(
+            f"{len(vectors)} events, {len(queries)} queries, recall@{k}; "
+            f"exact scan {exact_ms:.2f} ms/query"
+        )
+        self.stdout.write(
+            f"{'tables':>6} {'bits':>5} {'recall':>7} {'candidates':>11} {'ms/query':>9}"
+        )
+
+        for tables in options["tables"]:
+            for bits in options["bits"]:
+                self._evaluate(vectors, queries, exact, k, tables, bits)
+
+    def _top(self, query, candidates, vectors, k):
+        scored = (
+            (cosine_similarity(vectors[query], vectors[i]), i)
+            for i in candidates
+            if i != query
+        )
+        return {i for score, i in heapq.nlargest(k, scored) if score > MIN_SIMILARITY}
+
+    def _evaluate(self, vectors, queries, exact, k, tables, bits):
+        signatures = [signature(v, tables, bits) if v else [] for v in vectors]
+        buckets = defaultdict(set)
+        for i, sig in enumerate(signatures):
+            for table, bucket in enumerate(sig):
+                buckets[table, bucket].add(i)
+
+        found = expected = candidates = 0
+        started = time.perf_counter()
+        for q in queries:
+            nearby = set()
+            for table, bucket in enumerate(signatures[q]):
+                nearby |= buckets[table, bucket]
+            approximate = self._top(q, nearby, vectors, k)
+
+            found += len(approximate & exact[q])
+            expected += len(exact[q])
+            candidates += len(nearby)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        recall = found / expected if expected else 1.0
+        share = candidates / len(queries) / len(vectors)
+        self.stdout.write(
+            f"{tables:>6} {bits:>5} {recall:>7.3f} {share:>10.1%} {elapsed_ms:>9.2f}"
+        )
@@ -0,0 +1,35 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.events.similarity import rebuild_all_embeddings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute TF-IDF embeddings for every approved event, tokenizing and "
+        "vectorizing across a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (1 runs in-process).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        count = rebuild_all_embeddings(
+            progress=self._progress, workers=options["workers"]
+        )
+        self.stdout.write(f"Rebuilt embeddings for {count} events.")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Done in {elapsed:.2f}s."))
+
+    def _progress(self, stage, done, total):
+        self.stdout.write(f"  {stage}: {done}/{total}")
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.events.similarity import rebuild_all_embeddings, refresh_similarity_table
+
+
+class Command(BaseCommand):
+    help = "Recompute the similar-events neighbor table from stored embeddings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--embeddings",
+            action="store_true",
+            help="Recompute TF-IDF embeddings for every approved event first.",
+        )
+        parser.add_argument(
+            "--block-elements",
+            type=int,
+            default=None,
+            help="Maximum number of similarity scores held in memory at once.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        if options["embeddings"]:
+            count = rebuild_all_embeddings(progress=self._progress)
+            self.stdout.write(f"Rebuilt embeddings for {count} events.")
+        else:
+            count = refresh_similarity_table(options["block_elements"])
+            self.stdout.write(f"Wrote {count} neighbor rows.")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Done in {elapsed:.2f}s."))
+
+    def _progress(self, stage, done, total):
+        self.stdout.write(f"  {stage}: {done}/{total}")
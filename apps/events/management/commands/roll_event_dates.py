@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.events.jobs import roll_event_dates
+from apps.events.models import Event, refresh_event_dates
+from apps.jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Advance Event.next_start_date past occurrences that have started, "
+        "or schedule the recurring job that does it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute both date columns for every event.",
+        )
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            help="Enqueue the recurring roll-forward job instead of running now.",
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            created = enqueue(roll_event_dates, unique=True)
+            self.stdout.write(
+                "Scheduled date roll-forward."
+                if created
+                else "Date roll-forward already scheduled."
+            )
+            return
+
+        events = Event.objects.all()
+        if not options["all"]:
+            events = events.filter(next_start_date__lt=timezone.now())
+        count = refresh_event_dates(events)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed dates on {count} events."))
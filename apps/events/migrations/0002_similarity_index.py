@@ -0,0 +1,53 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarityIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("document_count", models.PositiveIntegerField(default=0)),
+                ("baseline_document_count", models.PositiveIntegerField(default=0)),
+                ("changes_since_rebuild", models.PositiveIntegerField(default=0)),
+                ("rebuilt_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Similarity Index",
+            },
+        ),
+        migrations.CreateModel(
+            name="SimilarityTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=255, unique=True)),
+                ("document_frequency", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:10
+
+from django.db import migrations
+
+# Dense vectors were positions in a sorted vocabulary that was never stored,
+# so they cannot be mapped onto SimilarityTerm ids. Drop them instead of
+# converting them into empty dicts; `manage.py rebuild_embeddings` (or
+# `rebuild_similarity`) recomputes them in the sparse format.
+
+
+def _clear(apps, kind):
+    Event = apps.get_model("events", "Event")
+    stale = [
+        pk
+        for pk, embedding in Event.objects.filter(embedding__isnull=False)
+        .values_list("id", "embedding")
+        .iterator()
+        if isinstance(embedding, kind)
+    ]
+    Event.objects.filter(pk__in=stale).update(embedding=None)
+
+
+def clear_dense(apps, schema_editor):
+    _clear(apps, list)
+
+
+def clear_sparse(apps, schema_editor):
+    _clear(apps, dict)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0002_similarity_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_dense, clear_sparse),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0003_sparse_embeddings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSimilarity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbors",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "neighbor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbor_of",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Event Similarities",
+                "ordering": ["event", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["event", "rank"], name="events_even_event_i_2ab5b0_idx"
+                    )
+                ],
+                "unique_together": {("event", "neighbor")},
+            },
+        ),
+    ]
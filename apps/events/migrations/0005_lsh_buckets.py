@@ -0,0 +1,45 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0004_event_similarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventLSHBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lsh_buckets",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["table", "bucket"], name="events_even_table_0aeba0_idx"
+                    )
+                ],
+                "unique_together": {("event", "table")},
+            },
+        ),
+    ]
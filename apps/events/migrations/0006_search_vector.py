@@ -0,0 +1,44 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:37
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+from apps.events.operations import AddPostgresIndex
+
+
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Event = apps.get_model("events", "Event")
+    Event.objects.update(
+        search_vector=SearchVector("title", weight="A", config="english")
+        + SearchVector("location", weight="B", config="english")
+        + SearchVector("description", weight="C", config="english")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0005_lsh_buckets"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        AddPostgresIndex(
+            model_name="event",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="events_event_search_gin"
+            ),
+        ),
+    ]
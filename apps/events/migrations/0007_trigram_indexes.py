@@ -0,0 +1,47 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.events.operations import AddPostgresIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0006_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # CreateExtension and AddPostgresIndex both skip non-Postgres databases.
+    operations = [
+        TrigramExtension(),
+        AddPostgresIndex(
+            model_name="event",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"],
+                name="events_event_title_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddPostgresIndex(
+            model_name="event",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["location"],
+                name="events_event_location_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddPostgresIndex(
+            model_name="event",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("location"),
+                    name="gin_trgm_ops",
+                ),
+                name="events_location_upper_trgm",
+            ),
+        ),
+    ]
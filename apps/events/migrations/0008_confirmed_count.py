@@ -0,0 +1,44 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_confirmed(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventAttendance = apps.get_model("bookings", "EventAttendance")
+
+    confirmed = (
+        EventAttendance.objects.filter(event=OuterRef("pk"), status="confirmed")
+        .order_by()
+        .values("event")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    Event.objects.update(confirmed_count=Coalesce(Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0001_initial"),
+        ("events", "0007_trigram_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="confirmed_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_confirmed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_approved", "-confirmed_count", "id"],
+                name="events_even_is_appr_69bcab_idx",
+            ),
+        ),
+    ]
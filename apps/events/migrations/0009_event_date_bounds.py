@@ -0,0 +1,56 @@
+# Generated by Django 6.1.2 on 2026-10-17 07:49
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+
+def fill_date_bounds(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventDate = apps.get_model("events", "EventDate")
+
+    dates = EventDate.objects.filter(event=OuterRef("pk"))
+    Event.objects.update(
+        next_start_date=Subquery(
+            dates.filter(start_date__gte=timezone.now())
+            .order_by("start_date")
+            .values("start_date")[:1]
+        ),
+        last_end_date=Subquery(dates.order_by("-end_date").values("end_date")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0008_confirmed_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="last_end_date",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="next_start_date",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_date_bounds, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_approved", "next_start_date"],
+                name="events_even_is_appr_f5a366_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_approved", "last_end_date"],
+                name="events_even_is_appr_953bd3_idx",
+            ),
+        ),
+    ]
@@ -1,11 +1,19 @@
 from decimal import Decimal
+from operator import attrgetter
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 
-from .services import ImageService
+from apps.jobs.queue import enqueue
+
+from .search import SEARCH_FIELDS, update_search_vectors
 
 
 class EventCategory(models.Model):
@@ -34,6 +42,8 @@ class Event(models.Model):
     )
 
     capacity = models.PositiveIntegerField(default=0)
+    # Maintained by EventAttendance; see apps.bookings.models.
+    confirmed_count = models.PositiveIntegerField(default=0, editable=False)
     ticket_price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -45,7 +55,11 @@ class Event(models.Model):
         EventCategory, related_name="events", blank=True
     )
     is_approved = models.BooleanField(default=False)
+    # Maintained from EventDate; see refresh_event_dates().
+    next_start_date = models.DateTimeField(null=True, editable=False)
+    last_end_date = models.DateTimeField(null=True, editable=False)
     embedding = models.JSONField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -56,12 +70,36 @@ class Event(models.Model):
             models.Index(fields=["is_approved", "-created_at"]),
             models.Index(fields=["organizer", "is_approved"]),
             models.Index(fields=["location"]),
+            models.Index(fields=["is_approved", "-confirmed_count", "id"]),
+            models.Index(fields=["is_approved", "next_start_date"]),
+            models.Index(fields=["is_approved", "last_end_date"]),
+            # The GIN indexes are Postgres-only and created outside the model
+            # state (see AddPostgresIndex): search_vector by migration 0006,
+            # title/location trigrams and UPPER(location) (which serves
+            # location__icontains) by 0007.
         ]
 
+    # Written by UPDATE queries elsewhere, so a plain save() must not
+    # overwrite them with whatever this instance loaded earlier.
+    MAINTAINED_FIELDS = {
+        "confirmed_count",
+        "embedding",
+        "search_vector",
+        "next_start_date",
+        "last_end_date",
+    }
+
     def __str__(self) -> str:
         return self.title
 
     def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.MAINTAINED_FIELDS
+            ]
+
         if not self.slug:
             base = slugify(self.title) or "event"
             slug = base
@@ -72,6 +110,10 @@ class Event(models.Model):
             self.slug = slug
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or SEARCH_FIELDS & set(update_fields):
+            update_search_vectors(Event.objects.filter(pk=self.pk))
+
     @property
     def is_free(self) -> bool:
         return self.ticket_price == Decimal("0.00")
@@ -80,8 +122,7 @@ class Event(models.Model):
     def available_spots(self) -> int | None:
         if self.capacity == 0:
             return None
-        booked = self.attendances.filter(status="confirmed").count()
-        return max(0, self.capacity - booked)
+        return max(0, self.capacity - self.confirmed_count)
 
     @property
     def is_sold_out(self) -> bool:
@@ -89,13 +130,45 @@ class Event(models.Model):
         return available is not None and available == 0
 
     @property
-    def next_date(self):
+    def is_upcoming(self) -> bool:
+        if self.next_start_date is None:
+            return False
         now = timezone.now()
-        return self.dates.filter(start_date__gte=now).order_by("start_date").first()
+        if self.next_start_date >= now:
+            return True
+        # Passed since the last run of the roll job, which owns the write;
+        # look for a later occurrence without touching the column here.
+        dates = self._prefetched("dates")
+        if dates is not None:
+            return any(date.start_date >= now for date in dates)
+        return self.dates.filter(start_date__gte=now).exists()
 
     @property
+    def next_date(self):
+        if self.next_start_date is None:
+            return None
+        start = max(self.next_start_date, timezone.now())
+        return self.dates.filter(start_date__gte=start).order_by("start_date").first()
+
+    def _prefetched(self, name: str) -> list | None:
+        return getattr(self, "_prefetched_objects_cache", {}).get(name)
+
+    # Card templates read these several times each, so they use a prefetched
+    # relation when the view supplied one and query at most once otherwise.
+    @cached_property
     def primary_image(self):
-        return self.images.filter(image_type="banner").first()
+        images = self._prefetched("images")
+        if images is None:
+            return self.images.filter(image_type="banner").order_by("pk").first()
+        banners = (image for image in images if image.image_type == "banner")
+        return min(banners, key=attrgetter("pk"), default=None)
+
+    @cached_property
+    def first_date(self):
+        dates = self._prefetched("dates")
+        if dates is None:
+            return self.dates.order_by("start_date").first()
+        return min(dates, key=attrgetter("start_date"), default=None)
 
 
 class EventDate(models.Model):
@@ -113,6 +186,31 @@ class EventDate(models.Model):
     def __str__(self) -> str:
         return f"{self.event.title}: {self.start_date.strftime('%Y-%m-%d %H:%M')}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        refresh_event_dates(Event.objects.filter(pk=self.event_id))
+
+
+def refresh_event_dates(queryset: models.QuerySet) -> int:
+    now = timezone.now()
+    dates = EventDate.objects.filter(event=OuterRef("pk"))
+    return queryset.update(
+        next_start_date=Subquery(
+            dates.filter(start_date__gte=now)
+            .order_by("start_date")
+            .values("start_date")[:1]
+        ),
+        last_end_date=Subquery(dates.order_by("-end_date").values("end_date")[:1]),
+    )
+
+
+@receiver(post_delete, sender=EventDate)
+def forget_event_date(sender, instance, origin=None, **kwargs):
+    # Skip the cascade from deleting the event itself.
+    if isinstance(origin, Event) or getattr(origin, "model", None) is Event:
+        return
+    refresh_event_dates(Event.objects.filter(pk=instance.event_id))
+
 
 def event_image_path(instance, filename: str) -> str:
     return f"events/{instance.event.id}/{filename}"
@@ -126,9 +224,81 @@ class EventImage(models.Model):
     image_type = models.CharField(max_length=20, choices=IMAGE_TYPES, default="gallery")
 
     def save(self, *args, **kwargs):
-        if self.image:
-            self.image = ImageService.downscale_image(self.image)
+        uploaded = bool(self.image) and not self.image._committed
         super().save(*args, **kwargs)
+        if uploaded:
+            enqueue("events.process_image", image_id=self.pk, unique=True)
 
     def __str__(self) -> str:
         return f"{self.event.title} - {self.image_type}"
+
+
+class EventSimilarity(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="neighbor_of"
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = "Event Similarities"
+        unique_together = ["event", "neighbor"]
+        ordering = ["event", "rank"]
+        indexes = [
+            models.Index(fields=["event", "rank"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event.title} -> {self.neighbor.title} ({self.score:.2f})"
+
+
+class EventLSHBucket(models.Model):
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+    table = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ["event", "table"]
+        indexes = [
+            models.Index(fields=["table", "bucket"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_id}: table {self.table}, bucket {self.bucket}"
+
+
+class SimilarityTerm(models.Model):
+    token = models.CharField(max_length=255, unique=True)
+    document_frequency = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"{self.token} ({self.document_frequency})"
+
+
+class SimilarityIndex(models.Model):
+    document_count = models.PositiveIntegerField(default=0)
+    baseline_document_count = models.PositiveIntegerField(default=0)
+    changes_since_rebuild = models.PositiveIntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Similarity Index"
+
+    def __str__(self) -> str:
+        return f"{self.document_count} documents, drift {self.drift:.2f}"
+
+    @classmethod
+    def load(cls, lock: bool = False) -> "SimilarityIndex":
+        cls.objects.get_or_create(pk=1)
+        queryset = cls.objects.select_for_update() if lock else cls.objects
+        return queryset.get(pk=1)
+
+    @property
+    def drift(self) -> float:
+        return self.changes_since_rebuild / max(self.baseline_document_count, 1)
@@ -0,0 +1,36 @@
+from django.db.migrations.operations.base import Operation
+
+
+class AddPostgresIndex(Operation):
+    # GIN indexes over tsvectors and trigram opclasses only exist on Postgres.
+    # They stay out of the migration state (and Event.Meta) entirely: SQLite,
+    # which the test database runs on, rebuilds tables from that state on
+    # every later AddField and would try to create them too.
+    reversible = True
+
+    def __init__(self, model_name, index):
+        self.model_name = model_name
+        self.index = index
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            model = to_state.apps.get_model(app_label, self.model_name)
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            model = from_state.apps.get_model(app_label, self.model_name)
+            schema_editor.remove_index(model, self.index)
+
+    def describe(self):
+        return f"Create Postgres index {self.index.name} on {self.model_name}"
+
+    def deconstruct(self):
+        return (
+            self.__class__.__qualname__,
+            [],
+            {"model_name": self.model_name, "index": self.index},
+        )
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+from collections.abc import Sequence
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CURSOR_SALT = "events.pagination.cursor"
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _sort_value(value):
+    # Unlike DjangoJSONEncoder, keep full microseconds: the equality half of
+    # the keyset comparison has to match the stored value exactly.
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot use {type(value).__name__} as a cursor key.")
+
+
+class CursorSerializer(signing.JSONSerializer):
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), default=_sort_value).encode(
+            "latin-1"
+        )
+
+
+def _ordering(queryset: QuerySet) -> list[tuple[str, bool]]:
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    keys = []
+    for field in ordering:
+        if not isinstance(field, str):
+            raise ValueError(f"Cursor pagination needs named sort keys, not {field!r}.")
+        descending = field.startswith("-")
+        name = field.lstrip("-")
+        keys.append(("pk" if name == "id" else name, descending))
+    if not any(name == "pk" for name, _ in keys):
+        keys.append(("pk", False))
+    return keys
+
+
+def _beyond(keys: list[tuple[str, bool]], values: list, reverse: bool) -> Q:
+    # (a, b) after (x, y) under ORDER BY a DESC, b ASC is
+    # a < x OR (a = x AND b > y); reverse flips every comparison.
+    condition = Q()
+    for i, (name, descending) in enumerate(keys):
+        lookup = "lt" if descending != reverse else "gt"
+        step = Q(**{f"{name}__{lookup}": values[i]})
+        for (prior, _), value in zip(keys[:i], values[:i], strict=False):
+            step &= Q(**{prior: value})
+        condition |= step
+    return condition
+
+
+def queryset_digest(queryset: QuerySet) -> str:
+    # The compiled WHERE already normalizes parameter order, blank filters and
+    # per-organizer scoping, so identical listings share one digest.
+    sql, params = queryset.order_by().query.sql_with_params()
+    return hashlib.md5(f"{sql}|{params!r}".encode(), usedforsecurity=False).hexdigest()
+
+
+def _count_key(queryset: QuerySet) -> str:
+    return f"listing-count:{queryset_digest(queryset)}"
+
+
+def _planner_estimate(queryset: QuerySet) -> int | None:
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    # Planner rows come from pg_class.reltuples scaled by column statistics.
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+def cached_count(queryset: QuerySet) -> int:
+    key = _count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.LISTING_COUNT_CACHE_TTL)
+    return count
+
+
+class CountingPaginator(Paginator):
+    def __init__(self, object_list, per_page, *args, estimate=False, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.estimate = estimate
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if self.estimate and cache.get(_count_key(self.object_list)) is None:
+            rows = _planner_estimate(self.object_list)
+            if rows is not None and rows >= settings.LISTING_COUNT_ESTIMATE_MIN:
+                self.count_is_estimate = True
+                return rows
+        return cached_count(self.object_list)
+
+    def validate_number(self, number):
+        # An estimated count is fine for the pages in between; reaching for
+        # the last page (or past the estimate) pins it down exactly.
+        try:
+            number = super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimate:
+                raise
+            self._exact_count()
+            return super().validate_number(number)
+        if self.count_is_estimate and number >= self.num_pages:
+            self._exact_count()
+            number = min(number, self.num_pages)
+        return number
+
+    def page(self, number):
+        page = super().page(number)
+        if self.count_is_estimate and not page.object_list:
+            # The estimate overshot; serve the real last page instead.
+            self._exact_count()
+            page = super().page(self.num_pages)
+        return page
+
+    def _exact_count(self):
+        self.count = cached_count(self.object_list)
+        self.count_is_estimate = False
+        self.__dict__.pop("num_pages", None)
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    def __init__(self, queryset: QuerySet, per_page: int):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = _ordering(queryset)
+        self.signature = [f"{'-' if d else ''}{name}" for name, d in self.keys]
+
+    @cached_property
+    def count(self):
+        return cached_count(self.queryset)
+
+    def encode(self, obj, direction: str) -> str:
+        values = [getattr(obj, name) for name, _ in self.keys]
+        return signing.dumps(
+            [direction, self.signature, values],
+            salt=CURSOR_SALT,
+            serializer=CursorSerializer,
+            compress=True,
+        )
+
+    def decode(self, cursor: str) -> tuple[str, list]:
+        try:
+            direction, signature, values = signing.loads(cursor, salt=CURSOR_SALT)
+        except (signing.BadSignature, ValueError, TypeError) as exc:
+            raise InvalidCursor("Malformed cursor.") from exc
+        if signature != self.signature or direction not in ("next", "prev"):
+            raise InvalidCursor("Cursor does not match this listing.")
+        return direction, values
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        direction, values = self.decode(cursor) if cursor else ("next", None)
+        backwards = direction == "prev"
+
+        queryset = self.queryset.order_by(
+            *(
+                f"{'-' if descending != backwards else ''}{name}"
+                for name, descending in self.keys
+            )
+        )
+        if values is not None:
+            queryset = queryset.filter(_beyond(self.keys, values, backwards))
+
+        rows = list(queryset[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        # Walking backwards from a cursor means there is always a page after
+        # it; walking forwards from one means there is always a page before.
+        has_next = more if not backwards else True
+        has_previous = more if backwards else values is not None
+        return CursorPage(
+            rows,
+            self,
+            self.encode(rows[-1], "next") if rows and has_next else None,
+            self.encode(rows[0], "prev") if rows and has_previous else None,
+        )
+
+
+class CursorPaginationMixin:
+    # Pages by the queryset's sort keys instead of OFFSET; ?page=N still uses
+    # the numbered paginator for old deep links.
+    cursor_param = "cursor"
+    paginator_class = CountingPaginator
+
+    def get_paginator(self, queryset, per_page, *args, **kwargs):
+        # Only bare listings are worth estimating; filtered ones are smaller
+        # and users notice when "12 results" is really 9.
+        filters = [
+            key
+            for key, values in self.request.GET.lists()
+            if key not in (self.page_kwarg, self.cursor_param) and any(values)
+        ]
+        kwargs.setdefault("estimate", not filters)
+        return super().get_paginator(queryset, per_page, *args, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET or self.page_kwarg in self.kwargs:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param))
+        except InvalidCursor as exc:
+            raise Http404(str(exc)) from exc
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import DecimalField, F, Q, QuerySet
+from django.db.models.functions import Cast, Greatest
+
+SEARCH_CONFIG = "english"
+SEARCH_FIELDS = {"title", "location", "description"}
+
+
+def _sort_key(expression):
+    # Ranks are float4, which a JSON float in a page cursor cannot reproduce
+    # exactly; a fixed numeric compares equal to its own string form.
+    return Cast(expression, DecimalField(max_digits=16, decimal_places=8))
+
+
+def search_vector() -> SearchVector:
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("location", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def on_postgres(queryset: QuerySet) -> bool:
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def update_search_vectors(queryset: QuerySet) -> int:
+    # The vector only feeds the Postgres GIN index; other backends never read it.
+    if not on_postgres(queryset):
+        return 0
+    return queryset.update(search_vector=search_vector())
+
+
+def search_events(queryset: QuerySet, text: str) -> QuerySet:
+    if not on_postgres(queryset):
+        # No tsquery or trigram operators here (the SQLite test database).
+        return queryset.filter(
+            Q(title__icontains=text)
+            | Q(location__icontains=text)
+            | Q(description__icontains=text)
+        )
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    matches = queryset.filter(search_vector=query)
+    if matches.exists():
+        return matches.annotate(
+            rank=_sort_key(SearchRank(F("search_vector"), query))
+        ).order_by("-rank", "id")
+
+    # Nothing matched word-for-word; tolerate typos on the short fields only.
+    # The %> operators filter through the trigram indexes before ranking.
+    return (
+        queryset.filter(
+            Q(title__trigram_word_similar=text) | Q(location__trigram_word_similar=text)
+        )
+        .annotate(
+            similarity=_sort_key(
+                Greatest(
+                    TrigramWordSimilarity(text, "title"),
+                    TrigramWordSimilarity(text, "location"),
+                )
+            )
+        )
+        .order_by("-similarity", "id")
+    )
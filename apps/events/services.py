@@ -34,10 +34,17 @@ class SimilarityService:
         return list(word_freq.values()) if max_freq > 0 else []
 
     @staticmethod
-    def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
+    def cosine_similarity(
+        vec1: list[float] | dict[str, float], vec2: list[float] | dict[str, float]
+    ) -> float:
         if not vec1 or not vec2:
             return 0.0
 
+        if isinstance(vec1, dict) and isinstance(vec2, dict):
+            from .similarity import cosine_similarity
+
+            return cosine_similarity(vec1, vec2)
+
         max_len = max(len(vec1), len(vec2))
         v1 = vec1 + [0.0] * (max_len - len(vec1))
         v2 = vec2 + [0.0] * (max_len - len(vec2))
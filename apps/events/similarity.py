@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import heapq
+import logging
 import math
 import re
+import time
 from collections import defaultdict
-from typing import Iterable
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Value
+from django.utils import timezone
+
+from .lsh import candidate_ids, rebuild_buckets, update_event_buckets
+
+logger = logging.getLogger(__name__)
 
 
 STOP_WORDS = {
@@ -77,6 +89,10 @@ STOP_WORDS = {
 }
 
 
+MIN_SIMILARITY = 0.15
+NEIGHBOR_BATCH_SIZE = 5000
+REBUILD_BATCH_SIZE = 500
+
 TOKEN_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE)
 
 
@@ -85,15 +101,26 @@ def tokenize(text: str) -> list[str]:
     return [t for t in tokens if t not in STOP_WORDS]
 
 
-def build_event_text(event) -> str:
-    title = (event.title or "") * 3
-    categories = " ".join(cat.name for cat in event.categories.all()) * 3
-    description = event.description or ""
-    location = (event.location or "") * 1
+def compose_event_text(
+    title: str, categories: Iterable[str], description: str, location: str
+) -> str:
+    title = (title or "") * 3
+    categories = " ".join(categories) * 3
+    description = description or ""
+    location = (location or "") * 1
 
     return " ".join([title, categories, description, location])
 
 
+def build_event_text(event) -> str:
+    return compose_event_text(
+        event.title,
+        [cat.name for cat in event.categories.all()],
+        event.description,
+        event.location,
+    )
+
+
 def build_vocabulary(texts: Iterable[str]) -> dict[str, int]:
     df: dict[str, int] = defaultdict(int)
 
@@ -113,98 +140,560 @@ def compute_idf(vocab: dict[str, int], doc_count: int) -> dict[str, float]:
 
 
 def text_to_vector(
-    text: str, idf: dict[str, float], vocab_order: list[str]
-) -> list[float]:
+    text: str, idf: dict[str, float], term_ids: dict[str, int]
+) -> dict[str, float]:
     tokens = tokenize(text)
     if not tokens:
-        return [0.0] * len(vocab_order)
+        return {}
 
     tf: dict[str, int] = defaultdict(int)
     for t in tokens:
         tf[t] += 1
 
     total = len(tokens)
-    vector: list[float] = []
+    weights: dict[str, float] = {}
 
-    for word in vocab_order:
-        tf_val = tf.get(word, 0) / total
-        vector.append(tf_val * idf.get(word, 0.0))
+    for word, count in tf.items():
+        weight = count / total * idf.get(word, 0.0)
+        if weight and word in term_ids:
+            weights[str(term_ids[word])] = weight
 
-    return vector
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    if norm == 0.0:
+        return {}
 
+    return {term: w / norm for term, w in weights.items()}
+
+
+def cosine_similarity(vec1: dict[str, float], vec2: dict[str, float]) -> float:
+    if len(vec1) > len(vec2):
+        vec1, vec2 = vec2, vec1
 
-def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     dot = 0.0
-    mag1 = 0.0
-    mag2 = 0.0
+    for term, weight in vec1.items():
+        other = vec2.get(term)
+        if other is not None:
+            dot += weight * other
+
+    if dot == 0.0:
+        return 0.0
 
-    for a, b in zip(vec1, vec2):
-        dot += a * b
-        mag1 += a * a
-        mag2 += b * b
+    mag1 = math.sqrt(sum(w * w for w in vec1.values()))
+    mag2 = math.sqrt(sum(w * w for w in vec2.values()))
 
     if mag1 == 0.0 or mag2 == 0.0:
         return 0.0
 
-    return dot / (math.sqrt(mag1) * math.sqrt(mag2))
+    return dot / (mag1 * mag2)
+
+
+def _terms(tokens: Iterable[str]) -> dict[str, tuple[int, int]]:
+    from .models import SimilarityTerm
+
+    rows = SimilarityTerm.objects.filter(token__in=list(tokens)).values_list(
+        "token", "id", "document_frequency"
+    )
+    return {token: (term_id, df) for token, term_id, df in rows}
+
+
+def vector_terms(vector) -> set[int]:
+    if not isinstance(vector, dict):
+        return set()
+    return {int(term) for term in vector}
 
 
-def rebuild_all_embeddings() -> int:
+def _approved_events():
     from .models import Event
 
-    events = list(Event.objects.filter(is_approved=True).prefetch_related("categories"))
+    return (
+        Event.objects.filter(is_approved=True)
+        .only("id", "title", "description", "location")
+        .prefetch_related("categories")
+        .order_by("id")
+    )
 
-    if not events:
-        return 0
 
-    texts = [build_event_text(e) for e in events]
-    vocab = build_vocabulary(texts)
-    vocab_order = sorted(vocab.keys())
-    idf = compute_idf(vocab, len(events))
+def _report(items: Iterable, stage: str, total: int, progress) -> Iterator:
+    done = 0
+    for item in items:
+        yield item
+        done += 1
+        if progress and (done % REBUILD_BATCH_SIZE == 0 or done == total):
+            progress(stage, done, total)
 
-    for event, text in zip(events, texts):
-        event.embedding = text_to_vector(text, idf, vocab_order)
-        event.save(update_fields=["embedding"])
 
-    return len(events)
+def _sync_terms(vocab: dict[str, int]) -> dict[str, int]:
+    from .models import SimilarityTerm
+
+    terms = list(SimilarityTerm.objects.only("id", "token"))
+    known = set()
+    for term in terms:
+        known.add(term.token)
+        term.document_frequency = vocab.get(term.token, 0)
+    SimilarityTerm.objects.bulk_update(
+        terms, ["document_frequency"], batch_size=REBUILD_BATCH_SIZE
+    )
+    SimilarityTerm.objects.bulk_create(
+        [
+            SimilarityTerm(token=token, document_frequency=df)
+            for token, df in vocab.items()
+            if token not in known
+        ],
+        batch_size=REBUILD_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+    return dict(SimilarityTerm.objects.values_list("token", "id"))
+
+
+def _text_batches(events, stage: str, total: int, progress) -> Iterator[list]:
+    batch = []
+    stream = events.iterator(chunk_size=REBUILD_BATCH_SIZE)
+    for event in _report(stream, stage, total, progress):
+        batch.append((event.pk, build_event_text(event)))
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rebuild_all_embeddings(progress=None, workers: int = 1) -> int:
+    from .models import Event, SimilarityIndex
+    from .vectorize import document_frequencies, vectorize
+
+    started = time.perf_counter()
+    events = _approved_events()
+
+    with transaction.atomic():
+        index = SimilarityIndex.load(lock=True)
+        total = events.count()
+
+        vocab = document_frequencies(
+            _text_batches(events, "frequencies", total, progress), workers
+        )
+        term_ids = _sync_terms(vocab)
+        idf = compute_idf(vocab, total)
+        logger.info(
+            "Counted %d terms over %d events in %.2fs",
+            len(vocab),
+            total,
+            time.perf_counter() - started,
+        )
+
+        batches = _text_batches(events, "vectors", total, progress)
+        for vectors in vectorize(batches, idf, term_ids, workers):
+            Event.objects.bulk_update(
+                [Event(pk=pk, embedding=vector) for pk, vector in vectors],
+                ["embedding"],
+            )
+
+        Event.objects.filter(is_approved=False, embedding__isnull=False).update(
+            embedding=None
+        )
+
+        index.document_count = total
+        index.baseline_document_count = total
+        index.changes_since_rebuild = 0
+        index.rebuilt_at = timezone.now()
+        index.save()
+        logger.info(
+            "Wrote %d embeddings in %.2fs", total, time.perf_counter() - started
+        )
+
+        if settings.SIMILARITY_ANN_ENABLED:
+            rebuild_buckets()
+        refresh_similarity_table()
+        logger.info("Rebuilt similarity index in %.2fs", time.perf_counter() - started)
+
+    return total
+
+
+def _reindex_event(event, indexed: bool) -> None:
+    from .models import Event, SimilarityIndex, SimilarityTerm
+
+    with transaction.atomic():
+        index = SimilarityIndex.load(lock=True)
+        if index.rebuilt_at is None:
+            rebuild_all_embeddings()
+            return
+
+        stored = Event.objects.filter(pk=event.pk).values_list("embedding", flat=True)
+        previous = stored.first()
+        was_indexed = isinstance(previous, dict)
+        if not (indexed or was_indexed):
+            return
+
+        text = build_event_text(event) if indexed else ""
+        tokens = set(tokenize(text))
+        terms = _terms(tokens)
+
+        missing = tokens - terms.keys()
+        if missing:
+            SimilarityTerm.objects.bulk_create(
+                [SimilarityTerm(token=token) for token in missing],
+                ignore_conflicts=True,
+            )
+            terms = _terms(tokens)
+
+        old_ids = vector_terms(previous)
+        new_ids = {term_id for term_id, _ in terms.values()}
+        added = new_ids - old_ids
+        removed = old_ids - new_ids
+
+        if added or removed or was_indexed != indexed:
+            SimilarityTerm.objects.filter(id__in=added).update(
+                document_frequency=F("document_frequency") + 1
+            )
+            SimilarityTerm.objects.filter(id__in=removed).update(
+                document_frequency=F("document_frequency") - 1
+            )
+
+            index.document_count += int(indexed) - int(was_indexed)
+            index.changes_since_rebuild += 1
+            index.save()
+
+            if index.drift >= settings.SIMILARITY_IDF_DRIFT_THRESHOLD:
+                rebuild_all_embeddings()
+                return
+
+            terms = _terms(tokens)
+
+        if indexed:
+            vocab = {token: df for token, (_, df) in terms.items()}
+            term_ids = {token: term_id for token, (term_id, _) in terms.items()}
+            idf = compute_idf(vocab, index.document_count)
+            event.embedding = text_to_vector(text, idf, term_ids)
+        else:
+            event.embedding = None
+        Event.objects.filter(pk=event.pk).update(embedding=event.embedding)
+
+        if settings.SIMILARITY_ANN_ENABLED:
+            update_event_buckets(event)
+        refresh_event_neighbors(event)
 
 
 def update_event_embedding(event) -> None:
-    rebuild_all_embeddings()
+    _reindex_event(event, indexed=event.is_approved)
+
+
+def deleted_event_state(event) -> dict:
+    # Read before the delete cascades away the row and its neighbor rows:
+    # the terms it counted towards and the full lists it sat in, which may
+    # have room for an event that never made the cut.
+    from .models import Event, EventSimilarity
+
+    stored = Event.objects.filter(pk=event.pk).values_list("embedding", flat=True)
+    containing = EventSimilarity.objects.filter(neighbor_id=event.pk).values("event_id")
+    full = (
+        EventSimilarity.objects.filter(event_id__in=containing)
+        .values("event_id")
+        .annotate(size=Count("id"))
+        .filter(size__gte=settings.SIMILARITY_NEIGHBORS)
+        .values_list("event_id", flat=True)
+    )
+    return {
+        "term_ids": sorted(vector_terms(stored.first())),
+        "refill": list(full),
+    }
+
+
+def forget_deleted_event(term_ids: list[int], refill: list[int]) -> None:
+    from .caching import bump_events
+    from .models import EventSimilarity, SimilarityIndex, SimilarityTerm
+
+    with transaction.atomic():
+        index = SimilarityIndex.load(lock=True)
+        if index.rebuilt_at is None:
+            return
+
+        if term_ids:
+            SimilarityTerm.objects.filter(id__in=term_ids).update(
+                document_frequency=F("document_frequency") - 1
+            )
+            index.document_count -= 1
+            index.changes_since_rebuild += 1
+            index.save()
+
+            if index.drift >= settings.SIMILARITY_IDF_DRIFT_THRESHOLD:
+                rebuild_all_embeddings()
+                return
+
+        ranked = _ranked_neighbors(set(refill), settings.SIMILARITY_NEIGHBORS)
+        EventSimilarity.objects.filter(event_id__in=ranked).delete()
+        EventSimilarity.objects.bulk_create(
+            [
+                row
+                for event_id, after in ranked.items()
+                for row in _neighbor_rows(event_id, after)
+            ],
+            batch_size=1000,
+        )
+        bump_events(ranked.keys())
+
+
+def _category_prefilter(categories: set[int]) -> Exists:
+    # Subqueries rather than id lists, so the database applies the filter
+    # however large the catalog grows.
+    from .models import Event
 
+    return Exists(
+        Event.categories.through.objects.filter(
+            event_id=OuterRef("pk"), eventcategory_id__in=categories
+        )
+    )
 
-def get_similar_events(event, limit: int = 5):
+
+def _uncategorized() -> Exists:
     from .models import Event
 
-    if not isinstance(event.embedding, list):
-        return []
+    return ~Exists(Event.categories.through.objects.filter(event_id=OuterRef("pk")))
 
-    candidates = (
-        Event.objects.filter(is_approved=True)
-        .exclude(id=event.id)
-        .prefetch_related("categories")
+
+def _indexed_rows(where: Q | None = None, **flags):
+    from .models import Event
+
+    queryset = Event.objects.filter(is_approved=True, embedding__isnull=False)
+    if where is not None:
+        queryset = queryset.filter(where)
+    return queryset.annotate(**flags).values_list("id", "embedding", *flags)
+
+
+def _indexed_vectors(where: Q | None = None) -> dict[int, dict]:
+    return dict(_indexed_rows(where))
+
+
+def _candidates(event, allowed: Q | None) -> Q | None:
+    if not settings.SIMILARITY_ANN_ENABLED:
+        return allowed
+
+    nearby = Q(id__in=candidate_ids(event.embedding))
+    return nearby if allowed is None else nearby & allowed
+
+
+def _neighbor_rows(event_id: int, ranked: list[tuple[float, int]]) -> list:
+    from .models import EventSimilarity
+
+    return [
+        EventSimilarity(
+            event_id=event_id, neighbor_id=neighbor_id, score=score, rank=rank
+        )
+        for rank, (score, neighbor_id) in enumerate(ranked)
+    ]
+
+
+def _ranked_neighbors(
+    event_ids: set[int], limit: int
+) -> dict[int, list[tuple[float, int]]]:
+    from .models import Event
+
+    ranked = {event_id: [] for event_id in event_ids}
+    if not event_ids:
+        return ranked
+
+    events = Event.objects.filter(
+        pk__in=event_ids, is_approved=True, embedding__isnull=False
+    ).prefetch_related("categories")
+    everything = None
+    for event in events:
+        if not isinstance(event.embedding, dict):
+            continue
+        event_cats = {category.pk for category in event.categories.all()}
+        allowed = _candidates(
+            event, Q(_category_prefilter(event_cats)) if event_cats else None
+        )
+        if allowed is None:
+            everything = _indexed_vectors() if everything is None else everything
+            vectors = everything
+        else:
+            vectors = _indexed_vectors(allowed)
+
+        scored = []
+        for other_id, other_vector in vectors.items():
+            if other_id == event.pk:
+                continue
+            score = cosine_similarity(event.embedding, other_vector)
+            if score > MIN_SIMILARITY:
+                scored.append((score, other_id))
+        ranked[event.pk] = heapq.nlargest(limit, scored)
+    return ranked
+
+
+def refresh_similarity_table(block_elements: int | None = None) -> int:
+    from .caching import bump_events
+    from .models import EventSimilarity
+    from .similarity_matrix import (
+        BLOCK_ELEMENTS,
+        load_categories,
+        load_matrix,
+        top_neighbors,
     )
 
+    ids, matrix = load_matrix()
+    categories = load_categories(ids)
+    neighbors = top_neighbors(
+        ids,
+        matrix,
+        categories,
+        limit=settings.SIMILARITY_NEIGHBORS,
+        min_score=MIN_SIMILARITY,
+        block_elements=block_elements or BLOCK_ELEMENTS,
+    )
+
+    total = 0
+    with transaction.atomic():
+        # Detail pages embed the neighbor list and are cached on the event
+        # version, so every event whose list changes gets bumped.
+        previous: dict[int, list[int]] = defaultdict(list)
+        for event_id, neighbor_id in EventSimilarity.objects.order_by(
+            "event_id", "rank"
+        ).values_list("event_id", "neighbor_id"):
+            previous[event_id].append(neighbor_id)
+        changed = set()
+
+        EventSimilarity.objects.all().delete()
+
+        rows = []
+        for event_id, ranked in neighbors:
+            if [neighbor_id for _, neighbor_id in ranked] != previous.pop(event_id, []):
+                changed.add(event_id)
+            rows.extend(_neighbor_rows(event_id, ranked))
+            if len(rows) >= NEIGHBOR_BATCH_SIZE:
+                EventSimilarity.objects.bulk_create(rows)
+                total += len(rows)
+                rows = []
+        EventSimilarity.objects.bulk_create(rows)
+        total += len(rows)
+
+        # Whatever is left in previous has no neighbors any more.
+        bump_events(changed | previous.keys())
+
+    return total
+
+
+def refresh_event_neighbors(event) -> None:
+    from .caching import bump_events
+    from .models import EventSimilarity
+
+    limit = settings.SIMILARITY_NEIGHBORS
+
+    with transaction.atomic():
+        EventSimilarity.objects.filter(event_id=event.pk).delete()
+        containing = set(
+            EventSimilarity.objects.filter(neighbor_id=event.pk).values_list(
+                "event_id", flat=True
+            )
+        )
+
+        own = []
+        incoming = {}
+        if event.is_approved and isinstance(event.embedding, dict):
+            event_cats = set(event.categories.values_list("id", flat=True))
+            uncategorized = _uncategorized()
+            if event_cats:
+                sharing = _category_prefilter(event_cats)
+                where = Q(sharing) | Q(uncategorized)
+            else:
+                sharing, where = Value(False), None
+            rows = _indexed_rows(
+                _candidates(event, where), sharing=sharing, uncategorized=uncategorized
+            )
+        else:
+            event_cats, rows = set(), []
+
+        for other_id, other_vector, shares, other_uncategorized in rows:
+            if other_id == event.pk:
+                continue
+            score = cosine_similarity(event.embedding, other_vector)
+            if score <= MIN_SIMILARITY:
+                continue
+            if not event_cats or shares:
+                own.append((score, other_id))
+            if shares or other_uncategorized:
+                incoming[other_id] = score
+
+        EventSimilarity.objects.bulk_create(
+            _neighbor_rows(event.pk, heapq.nlargest(limit, own))
+        )
+
+        affected = containing | incoming.keys()
+        current: dict[int, list[tuple[float, int]]] = defaultdict(list)
+        rows = EventSimilarity.objects.filter(event_id__in=affected).values_list(
+            "event_id", "neighbor_id", "score"
+        )
+        for event_id, neighbor_id, score in rows:
+            current[event_id].append((score, neighbor_id))
+
+        changed = set()
+        refill = set()
+        updates = {}
+        for event_id in affected:
+            before = current[event_id]
+            old_score = next((sc for sc, n in before if n == event.pk), None)
+            new_score = incoming.get(event_id)
+            if (
+                len(before) >= limit
+                and old_score is not None
+                and (new_score is None or new_score < old_score)
+            ):
+                # The event left or sank in a full list, so something that
+                # never made the cut may belong there now: rank it afresh.
+                refill.add(event_id)
+                continue
+            after = [(score, n) for score, n in before if n != event.pk]
+            if new_score is not None:
+                after.append((new_score, event.pk))
+            updates[event_id] = heapq.nlargest(limit, after)
+        updates.update(_ranked_neighbors(refill, limit))
+
+        replacements = []
+        for event_id, after in updates.items():
+            if after != sorted(current[event_id], reverse=True):
+                changed.add(event_id)
+                replacements.extend(_neighbor_rows(event_id, after))
+
+        EventSimilarity.objects.filter(event_id__in=changed).delete()
+        EventSimilarity.objects.bulk_create(replacements, batch_size=1000)
+        bump_events(changed | {event.pk})
+
+
+def compute_similar_events(event, limit: int = 5):
+    from .models import Event
+
+    if not isinstance(event.embedding, dict):
+        return []
+
+    candidates = Event.objects.filter(is_approved=True).exclude(id=event.id)
+
     event_cats = set(event.categories.values_list("id", flat=True))
+    sharing = Q(_category_prefilter(event_cats)) if event_cats else None
+    allowed = _candidates(event, sharing)
+    if allowed is not None:
+        candidates = candidates.filter(allowed)
 
     scored = []
 
     for other in candidates:
-        if not isinstance(other.embedding, list):
-            continue
-
-        other_cats = set(other.categories.values_list("id", flat=True))
-        if event_cats and not (event_cats & other_cats):
-            continue
-
-        if len(other.embedding) != len(event.embedding):
+        if not isinstance(other.embedding, dict):
             continue
 
         score = cosine_similarity(event.embedding, other.embedding)
 
-        if score > 0.15:
+        if score > MIN_SIMILARITY:
             scored.append((other, score))
 
     scored.sort(key=lambda x: x[1], reverse=True)
 
     return [e for e, _ in scored[:limit]]
+
+
+def get_similar_events(event, limit: int = 5):
+    from .models import EventSimilarity
+
+    rows = (
+        EventSimilarity.objects.filter(event_id=event.pk)
+        .select_related("neighbor")
+        .prefetch_related("neighbor__images")
+        .order_by("rank")[:limit]
+    )
+    return [row.neighbor for row in rows]
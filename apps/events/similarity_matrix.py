@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+
+import numpy as np
+from scipy import sparse
+
+# Upper bound on the number of scores held per block. With COO indices and
+# the filtered copies each score costs ~40 bytes, so this peaks near 80MB.
+BLOCK_ELEMENTS = 2_000_000
+
+
+def load_matrix(chunk_size: int = 2000) -> tuple[np.ndarray, sparse.csr_matrix]:
+    from .models import Event
+
+    ids = array("q")
+    indptr = array("q", [0])
+    indices = array("q")
+    data = array("f")
+
+    rows = (
+        Event.objects.filter(is_approved=True, embedding__isnull=False)
+        .order_by("id")
+        .values_list("id", "embedding")
+    )
+    for event_id, embedding in rows.iterator(chunk_size=chunk_size):
+        if not isinstance(embedding, dict):
+            continue
+        ids.append(event_id)
+        for term, weight in embedding.items():
+            indices.append(int(term))
+            data.append(weight)
+        indptr.append(len(indices))
+
+    columns = max(indices) + 1 if indices else 0
+    matrix = sparse.csr_matrix(
+        (
+            np.frombuffer(data, dtype=np.float32),
+            np.frombuffer(indices, dtype=np.int64),
+            np.frombuffer(indptr, dtype=np.int64),
+        ),
+        shape=(len(ids), columns),
+    )
+
+    return np.frombuffer(ids, dtype=np.int64), normalize_rows(matrix)
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sparse.diags(scale.astype(np.float32)) @ matrix
+
+
+def load_categories(ids: np.ndarray) -> sparse.csr_matrix:
+    from .models import Event
+
+    memberships = Event.categories.through.objects.filter(
+        event__is_approved=True
+    ).values_list("event_id", "eventcategory_id")
+    memberships = np.array(list(memberships), dtype=np.int64).reshape(-1, 2)
+    if not len(ids):
+        return sparse.csr_matrix((0, 0), dtype=np.float32)
+
+    rows = np.searchsorted(ids, memberships[:, 0])
+    known = (rows < len(ids)) & (
+        ids[np.minimum(rows, len(ids) - 1)] == memberships[:, 0]
+    )
+    rows = rows[known]
+    categories, columns = np.unique(memberships[known, 1], return_inverse=True)
+
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(ids), len(categories)),
+    )
+
+
+def top_neighbors(
+    ids: np.ndarray,
+    matrix: sparse.csr_matrix,
+    categories: sparse.csr_matrix,
+    limit: int,
+    min_score: float,
+    block_elements: int = BLOCK_ELEMENTS,
+) -> Iterator[tuple[int, list[tuple[float, int]]]]:
+    n = matrix.shape[0]
+    k = min(limit, n - 1)
+    if k <= 0:
+        return
+
+    chunk = max(1, block_elements // n)
+    transposed = matrix.T.tocsr()
+    has_categories = np.diff(categories.indptr) > 0
+
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        scores = (matrix[start:stop] @ transposed).tocoo()
+
+        keep = (scores.col != scores.row + start) & (scores.data > min_score)
+        rows, columns, values = scores.row[keep], scores.col[keep], scores.data[keep]
+
+        restricted = has_categories[rows + start] if categories.shape[1] else None
+        if restricted is not None and restricted.any():
+            shared = categories[rows[restricted] + start].multiply(
+                categories[columns[restricted]]
+            )
+            keep = np.ones(len(rows), dtype=bool)
+            keep[restricted] = np.asarray(shared.sum(axis=1)).ravel() > 0
+            rows, columns, values = rows[keep], columns[keep], values[keep]
+
+        order = np.lexsort((-values, rows))
+        rows, columns, values = rows[order], columns[order], values[order]
+
+        first = np.searchsorted(rows, np.arange(stop - start))
+        top = np.arange(len(rows)) - first[rows] < k
+        rows, columns, values = rows[top], columns[top], values[top]
+        bounds = np.searchsorted(rows, np.arange(stop - start + 1))
+
+        for i in range(stop - start):
+            lo, hi = bounds[i], bounds[i + 1]
+            yield (
+                int(ids[start + i]),
+                [
+                    (float(score), int(ids[j]))
+                    for score, j in zip(values[lo:hi], columns[lo:hi], strict=True)
+                ],
+            )
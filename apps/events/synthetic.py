@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+TOPICS = {
+    "Music": [
+        "jazz",
+        "rock",
+        "guitar",
+        "concert",
+        "band",
+        "acoustic",
+        "drums",
+        "vocals",
+        "album",
+        "festival",
+        "orchestra",
+        "piano",
+    ],
+    "Technology": [
+        "python",
+        "django",
+        "cloud",
+        "startup",
+        "hackathon",
+        "ai",
+        "data",
+        "security",
+        "devops",
+        "mobile",
+        "api",
+        "kubernetes",
+    ],
+    "Food": [
+        "momo",
+        "tasting",
+        "chef",
+        "cuisine",
+        "street",
+        "brunch",
+        "coffee",
+        "tea",
+        "baking",
+        "spices",
+        "dinner",
+        "market",
+    ],
+    "Sports": [
+        "football",
+        "cricket",
+        "marathon",
+        "cycling",
+        "futsal",
+        "league",
+        "tournament",
+        "training",
+        "trek",
+        "climbing",
+        "yoga",
+        "fitness",
+    ],
+    "Arts": [
+        "painting",
+        "gallery",
+        "exhibition",
+        "theatre",
+        "poetry",
+        "photography",
+        "sculpture",
+        "film",
+        "craft",
+        "dance",
+        "thangka",
+        "design",
+    ],
+    "Business": [
+        "networking",
+        "marketing",
+        "finance",
+        "leadership",
+        "investors",
+        "pitch",
+        "sales",
+        "strategy",
+        "founders",
+        "summit",
+        "career",
+        "mentorship",
+    ],
+}
+
+LOCATIONS = [
+    "Kathmandu",
+    "Lalitpur",
+    "Bhaktapur",
+    "Pokhara",
+    "Chitwan",
+    "Biratnagar",
+    "Butwal",
+    "Dharan",
+    "Janakpur",
+    "Nepalgunj",
+]
+
+FILLER = [
+    "evening",
+    "weekend",
+    "session",
+    "meetup",
+    "night",
+    "live",
+    "open",
+    "special",
+    "annual",
+    "beginners",
+    "advanced",
+    "family",
+    "outdoor",
+    "workshop",
+    "showcase",
+    "free",
+]
+
+
+@dataclass
+class SyntheticEvent:
+    title: str
+    description: str
+    location: str
+    ticket_price: Decimal
+    categories: list[str] = field(default_factory=list)
+
+
+def synthetic_events(count: int, seed: int = 0) -> Iterator[SyntheticEvent]:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+
+    for i in range(count):
+        chosen = rng.sample(topics, rng.choice([1, 1, 1, 2]))
+        words = [w for topic in chosen for w in TOPICS[topic]]
+
+        title_words = rng.sample(words, 2) + [rng.choice(FILLER)]
+        description = rng.choices(words, k=rng.randint(15, 40)) + rng.choices(
+            FILLER, k=rng.randint(5, 15)
+        )
+        price = Decimal(rng.choice([0, 0, 200, 500, 1000, 2500]))
+
+        yield SyntheticEvent(
+            title=f"{' '.join(title_words).title()} {i}",
+            description=" ".join(description),
+            location=rng.choice(LOCATIONS),
+            ticket_price=price,
+            categories=chosen,
+        )
+
+
+def create_synthetic_events(
+    count: int, seed: int = 0, approved: bool = True, batch_size: int = 2000
+) -> int:
+    from django.utils.text import slugify
+
+    from .models import Event, EventCategory
+    from .search import update_search_vectors
+
+    categories = {}
+    for name in TOPICS:
+        categories[name], _ = EventCategory.objects.get_or_create(
+            slug=f"synthetic-{slugify(name)}", defaults={"name": f"{name} (synthetic)"}
+        )
+
+    Membership = Event.categories.through
+    events, topics = [], []
+    created = 0
+
+    def flush():
+        nonlocal created
+        Event.objects.bulk_create(events)
+        update_search_vectors(Event.objects.filter(pk__in=[e.pk for e in events]))
+        Membership.objects.bulk_create(
+            Membership(event_id=event.pk, eventcategory_id=categories[name].pk)
+            for event, names in zip(events, topics, strict=True)
+            for name in names
+        )
+        created += len(events)
+        events.clear()
+        topics.clear()
+
+    for i, synthetic in enumerate(synthetic_events(count, seed)):
+        events.append(
+            Event(
+                title=synthetic.title,
+                slug=f"synthetic-{seed}-{i}",
+                description=synthetic.description,
+                location=synthetic.location,
+                ticket_price=synthetic.ticket_price,
+                capacity=100,
+                is_approved=approved,
+            )
+        )
+        topics.append(synthetic.categories)
+        if len(events) >= batch_size:
+            flush()
+    if events:
+        flush()
+
+    return created
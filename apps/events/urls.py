@@ -4,6 +4,11 @@ from . import views
 
 urlpatterns = [
     path("explore/", views.EventListView.as_view(), name="explore"),
+    path(
+        "explore/autocomplete/",
+        views.EventAutocompleteView.as_view(),
+        name="explore_autocomplete",
+    ),
     path("event/new/", views.EventCreateView.as_view(), name="event_create"),
     path("event/<slug:slug>/", views.EventDetailView.as_view(), name="event_detail"),
     path(
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import multiprocessing
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from .similarity import text_to_vector, tokenize
+
+Batch = list[tuple[int, str]]
+
+_idf: dict[str, float] = {}
+_term_ids: dict[str, int] = {}
+
+
+def count_terms(batch: Batch) -> Counter:
+    counts: Counter = Counter()
+    for _, text in batch:
+        counts.update(set(tokenize(text)))
+    return counts
+
+
+def _init_vectorizer(idf: dict[str, float], term_ids: dict[str, int]) -> None:
+    global _idf, _term_ids
+    _idf, _term_ids = idf, term_ids
+
+
+def _vectorize(batch: Batch) -> list[tuple[int, dict[str, float]]]:
+    return [(pk, text_to_vector(text, _idf, _term_ids)) for pk, text in batch]
+
+
+def _pool(workers: int, initializer=None, initargs=()) -> ProcessPoolExecutor:
+    # Spawned workers never inherit the parent's database connections.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def _bounded_map(
+    executor: Executor, fn: Callable, batches: Iterable[Batch], window: int
+) -> Iterator:
+    pending: deque = deque()
+    for batch in batches:
+        pending.append(executor.submit(fn, batch))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def document_frequencies(batches: Iterable[Batch], workers: int = 1) -> Counter:
+    vocab: Counter = Counter()
+    if workers <= 1:
+        for batch in batches:
+            vocab.update(count_terms(batch))
+        return vocab
+
+    with _pool(workers) as executor:
+        for counts in _bounded_map(executor, count_terms, batches, workers * 2):
+            vocab.update(counts)
+    return vocab
+
+
+def vectorize(
+    batches: Iterable[Batch],
+    idf: dict[str, float],
+    term_ids: dict[str, int],
+    workers: int = 1,
+) -> Iterator[list[tuple[int, dict[str, float]]]]:
+    if workers <= 1:
+        _init_vectorizer(idf, term_ids)
+        for batch in batches:
+            yield _vectorize(batch)
+        return
+
+    with _pool(workers, _init_vectorizer, (idf, term_ids)) as executor:
+        yield from _bounded_map(executor, _vectorize, batches, workers * 2)
@@ -1,16 +1,17 @@
+from datetime import datetime, time, timedelta
 from decimal import Decimal
-from django.db.models import OuterRef, Subquery, IntegerField
 
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, Prefetch, Q
-from django.db.models.functions import Greatest
-from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.text import slugify
+from django.views import View
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -20,7 +21,22 @@ from django.views.generic import (
 )
 
 from apps.bookings.models import EventAttendance
-
+from apps.bookings.services import attendee_previews
+from apps.jobs.queue import enqueue
+
+from .autocomplete import suggest
+from .caching import (
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    catalog_version,
+    category_catalog,
+    event_and_catalog_versions,
+    make_etag,
+    render_event_cards,
+    request_digest,
+    version_time,
+)
+from .facets import PRICE_BUCKETS, date_windows, facet_counts
 from .forms import (
     EventDateForm,
     EventDateFormSet,
@@ -29,10 +45,24 @@ from .forms import (
     EventImageFormSet,
 )
 from .models import Event, EventCategory, EventDate
-from .similarity import get_similar_events, update_event_embedding
+from .pagination import CursorPaginationMixin
+from .search import search_events
+from .similarity import get_similar_events
+
 
+def _day_start(value: str, days: int = 0) -> datetime | None:
+    try:
+        day = parse_date(value)
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day + timedelta(days=days), time.min))
 
-class EventListView(ListView):
+
+class EventListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView
+):
     template_name = "events/explore.html"
     model = Event
     context_object_name = "events"
@@ -45,52 +75,64 @@ class EventListView(ListView):
             "dates", EventDate.objects.filter(end_date__gte=now).order_by("start_date")
         )
 
-        confirmed_attendances = Prefetch(
-            "attendances", EventAttendance.objects.filter(status="confirmed")
-        )
-
-        attendance_count_subq = (
-            EventAttendance.objects.filter(event=OuterRef("pk"), status="confirmed")
-            .order_by()
-            .values("event")
-            .annotate(c=Count("id"))
-            .values("c")
-        )
-
         queryset = (
             Event.objects.filter(is_approved=True)
             .select_related("organizer")
-            .prefetch_related(
-                "categories", future_dates, "images", confirmed_attendances
-            )
-            .annotate(
-                confirmed_count=Subquery(
-                    attendance_count_subq, output_field=IntegerField()
-                )
-            )
+            .prefetch_related("categories", future_dates, "images")
         )
 
-        search = self.request.GET.get("q") or self.request.GET.get("search")
-        if search:
-            search = search.strip()
-            queryset = (
-                queryset.annotate(
-                    similarity=Greatest(
-                        TrigramSimilarity("title", search),
-                        TrigramSimilarity("location", search),
-                        TrigramSimilarity("description", search),
-                    )
-                )
-                .filter(similarity__gte=0.12)
-                .distinct()
-                .order_by("-similarity")
-            )
-
         location = self.request.GET.get("location")
         if location:
             location = location.strip()
             queryset = queryset.filter(location__icontains=location)
 
+        min_price = self.request.GET.get("min_price")
+        if min_price:
+            queryset = queryset.filter(ticket_price__gte=Decimal(min_price))
+
+        max_price = self.request.GET.get("max_price")
+        if max_price:
+            queryset = queryset.filter(ticket_price__lte=Decimal(max_price))
+
+        date_from = _day_start(self.request.GET.get("date_from", ""))
+        date_to = _day_start(self.request.GET.get("date_to", ""), days=1)
+        if date_from:
+            # A recurring event matches on any occurrence in the range, not
+            # just its next one; EXISTS walks the (event, start_date) index.
+            occurrences = EventDate.objects.filter(
+                event=OuterRef("pk"), start_date__gte=date_from
+            )
+            if date_to:
+                occurrences = occurrences.filter(start_date__lt=date_to)
+            queryset = queryset.filter(Exists(occurrences))
+        elif date_to:
+            # Plain ranges on next_start_date stay on the (is_approved,
+            # next_start_date) index, unlike a join to dates or a __date cast.
+            queryset = queryset.filter(next_start_date__lt=date_to)
+
+        search = self.request.GET.get("q") or self.request.GET.get("search")
+        if search and search.strip():
+            queryset = search_events(queryset, search.strip())
+
+        # Filters that have counts next to them are kept apart, so each
+        # group can be counted with every filter but its own.
+        self.facet_base = queryset
+        self.facet_filters = self.get_facet_filters()
+
+        qs = queryset
+        for condition in self.facet_filters.values():
+            qs = qs.filter(condition)
+        if "category" in self.facet_filters or (search and search.strip()):
+            qs = qs.distinct()
+
+        if not qs.query.order_by:
+            qs = qs.order_by("-confirmed_count", "id")
+
+        return qs
+
+    def get_facet_filters(self) -> dict[str, Q]:
+        filters = {}
+
         categories = [c for c in self.request.GET.getlist("category") if c.strip()]
         if not categories:
             single_cat = self.request.GET.get("category")
@@ -114,65 +156,99 @@ class EventListView(ListView):
                 category_filter |= Q(categories__id__in=id_filters)
 
             if category_filter:
-                queryset = queryset.filter(category_filter).distinct()
-
-        min_price = self.request.GET.get("min_price")
-        if min_price:
-            queryset = queryset.filter(ticket_price__gte=Decimal(min_price))
-
-        max_price = self.request.GET.get("max_price")
-        if max_price:
-            queryset = queryset.filter(ticket_price__lte=Decimal(max_price))
+                filters["category"] = category_filter
 
         free_only = self.request.GET.get("free_only") or self.request.GET.get("free")
         if free_only:
-            queryset = queryset.filter(ticket_price=Decimal("0.00"))
-
-        date_from = self.request.GET.get("date_from")
-        if date_from:
-            queryset = queryset.filter(dates__start_date__date__gte=date_from)
-
-        date_to = self.request.GET.get("date_to")
-        if date_to:
-            queryset = queryset.filter(dates__start_date__date__lte=date_to)
+            filters["free"] = Q(ticket_price=Decimal("0.00"))
 
-        if "category_filter" in locals() and category_filter:
-            qs = queryset.distinct()
-        else:
-            qs = queryset
+        price = self.request.GET.get("price")
+        if price in PRICE_BUCKETS:
+            filters["price"] = PRICE_BUCKETS[price][1]
 
-        if not qs.query.order_by:
-            qs = qs.order_by("-confirmed_count", "id")
+        windows = date_windows()
+        when = self.request.GET.get("when")
+        if when in windows:
+            filters["when"] = windows[when][1]
 
-        return qs
+        return filters
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filter_form"] = EventFilterForm(self.request.GET or None)
-        context["categories"] = EventCategory.objects.all()
+
+        render_event_cards(context["events"], self.request, attendee_previews)
+
+        categories = category_catalog.all()
+        facets = facet_counts(self.facet_base, self.facet_filters, categories)
+        for category in categories:
+            category.event_count = facets["categories"][category.pk]
+        context["categories"] = categories
+        context["facets"] = facets
         return context
 
+    def get_validators(self):
+        # The date facets and filters roll over at midnight as well.
+        version = catalog_version()
+        today = timezone.localdate()
+        etag = make_etag(
+            request_digest(self.request), version, today, self.request.user.pk
+        )
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        return etag, max(version_time(version), midnight)
+
     def render_to_response(self, context, **response_kwargs):
         return super().render_to_response(context, **response_kwargs)
 
 
-class EventDetailView(DetailView):
+class EventAutocompleteView(View):
+    def get(self, request):
+        return JsonResponse(suggest(request.GET.get("q", "")))
+
+
+class EventDetailView(ConditionalGetMixin, AnonymousPageCacheMixin, DetailView):
     template_name = "events/detail.html"
     model = Event
     context_object_name = "event"
 
-    def get_queryset(self):
-        confirmed_attendances = Prefetch(
-            "attendances", EventAttendance.objects.filter(status="confirmed")
-        )
-        queryset = (
-            Event.objects.select_related("organizer")
-            .prefetch_related("categories", "dates", "images", confirmed_attendances)
-            .annotate(
-                confirmed_count=Count(
-                    "attendances", filter=Q(attendances__status="confirmed")
-                )
+    def _event_state(self):
+        if not hasattr(self, "_state"):
+            self._state = (
+                self.get_queryset()
+                .filter(slug=self.kwargs.get("slug"))
+                .values("pk", "updated_at", "confirmed_count")
+                .first()
             )
+            if self._state is not None:
+                self._state["versions"] = event_and_catalog_versions(self._state["pk"])
+        return self._state
+
+    def get_page_version(self):
+        state = self._event_state()
+        return None if state is None else str(state["versions"][0])
+
+    def get_validators(self):
+        # The catalog version covers the similar-events cards.
+        state = self._event_state()
+        if state is None:
+            return None
+        event_version, catalog = state["versions"]
+        etag = make_etag(
+            state["pk"],
+            state["updated_at"].isoformat(),
+            state["confirmed_count"],
+            event_version,
+            catalog,
+            self.request.user.pk,
+        )
+        last_modified = max(
+            state["updated_at"], version_time(event_version), version_time(catalog)
+        )
+        return etag, last_modified
+
+    def get_queryset(self):
+        queryset = Event.objects.select_related("organizer").prefetch_related(
+            "categories", "dates", "images"
         )
         if not self.request.user.is_authenticated:
             return queryset.filter(is_approved=True)
@@ -190,9 +266,10 @@ class EventDetailView(DetailView):
             ).first()
             context["is_owner"] = event.organizer == self.request.user
 
+        context["attendee_preview"] = attendee_previews([event.pk]).get(event.pk, [])
         context["similar_events"] = get_similar_events(event, limit=4)
         context["now"] = timezone.now()
-        context["has_future_dates"] = event.next_date is not None
+        context["has_future_dates"] = event.is_upcoming
         return context
 
 
@@ -324,7 +401,7 @@ class EventUpdateView(EventOwnerMixin, UpdateView):
 
             date_formset.save()
             image_formset.save()
-            update_event_embedding(self.object)
+            enqueue("events.reindex", event_id=self.object.pk, unique=True)
 
             messages.success(self.request, "Event updated successfully!")
             return redirect("event_detail", slug=self.object.slug)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.jobs"
+    verbose_name = "Jobs"
+
+    def ready(self):
+        # Handlers live in each app's jobs.py and register themselves on import.
+        autodiscover_modules("jobs")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Summarize queue depth and job timings per job name."
+
+    def handle(self, *args, **options):
+        rows = (
+            Job.objects.values("name")
+            .annotate(
+                pending=Count("id", filter=Q(status="pending")),
+                running=Count("id", filter=Q(status="running")),
+                done=Count("id", filter=Q(status="done")),
+                failed=Count("id", filter=Q(status="failed")),
+                avg_ms=Avg("duration_ms", filter=Q(status="done")),
+                max_ms=Max("duration_ms", filter=Q(status="done")),
+                oldest=Min("run_at", filter=Q(status="pending")),
+            )
+            .order_by("name")
+        )
+
+        self.stdout.write(
+            f"{'name':<28} {'pending':>7} {'running':>7} {'done':>7} "
+            f"{'failed':>6} {'avg ms':>8} {'max ms':>8} {'lag s':>7}"
+        )
+        now = timezone.now()
+        for row in rows:
+            lag = max((now - row["oldest"]).total_seconds(), 0) if row["oldest"] else 0
+            self.stdout.write(
+                f"{row['name']:<28} {row['pending']:>7} {row['running']:>7} "
+                f"{row['done']:>7} {row['failed']:>6} {row['avg_ms'] or 0:>8.1f} "
+                f"{row['max_ms'] or 0:>8.1f} {lag:>7.1f}"
+            )
@@ -0,0 +1,62 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.jobs.queue import claim, run
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Exit after processing this many jobs.",
+        )
+        parser.add_argument(
+            "--name",
+            action="append",
+            dest="names",
+            help="Only process jobs with this name (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        processed = failed = 0
+        while not self.stopping:
+            close_old_connections()
+            job = claim(options["names"])
+            if job is None:
+                if options["burst"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+
+            processed += 1
+            if not run(job):
+                failed += 1
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(f"Processed {processed} jobs ({failed} not completed).")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 3600
+# A running job is handed out again once its worker has missed heartbeats
+# for this long; the worker beats every HEARTBEAT_INTERVAL while it runs,
+# so long rebuilds keep their claim and only dead workers lose theirs.
+STALE_AFTER = timedelta(minutes=15)
+HEARTBEAT_INTERVAL = timedelta(minutes=1)
+
+registry: dict[str, Callable] = {}
+
+
+def job(name: str, max_attempts: int = 5) -> Callable:
+    def register(func: Callable) -> Callable:
+        func.job_name = name
+        func.max_attempts = max_attempts
+        registry[name] = func
+        return func
+
+    return register
+
+
+def enqueue(
+    task: str | Callable,
+    *,
+    run_at: datetime | None = None,
+    unique: bool = False,
+    **payload,
+) -> Job | None:
+    name = task if isinstance(task, str) else task.job_name
+    max_attempts = getattr(registry.get(name), "max_attempts", 5)
+
+    pending = Job.objects.filter(name=name, payload=payload, status="pending")
+    if unique and pending.exists():
+        return None
+
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim(names: list[str] | None = None) -> Job | None:
+    now = timezone.now()
+    cutoff = now - STALE_AFTER
+    ready = (
+        Q(status="pending", run_at__lte=now)
+        | Q(status="running", heartbeat_at__lt=cutoff)
+        | Q(status="running", heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(ready)
+        if names:
+            jobs = jobs.filter(name__in=names)
+        claimed = jobs.order_by("run_at", "id").first()
+        if claimed is None:
+            return None
+
+        claimed.status = "running"
+        claimed.attempts += 1
+        claimed.started_at = claimed.heartbeat_at = now
+        claimed.save(update_fields=["status", "attempts", "started_at", "heartbeat_at"])
+
+    return claimed
+
+
+class Heartbeat(threading.Thread):
+    def __init__(self, job_id: int):
+        super().__init__(name=f"job-heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        # Its own connection in autocommit, so beats land while the job's
+        # transaction is still open.
+        try:
+            while not self.stopped.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                try:
+                    Job.objects.filter(pk=self.job_id, status="running").update(
+                        heartbeat_at=timezone.now()
+                    )
+                except DatabaseError:
+                    logger.warning(
+                        "Heartbeat for job #%d failed", self.job_id, exc_info=True
+                    )
+        finally:
+            connection.close()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def run(claimed: Job) -> bool:
+    func = registry.get(claimed.name)
+    started = time.perf_counter()
+    waited = (claimed.started_at - claimed.run_at).total_seconds()
+
+    heartbeat = Heartbeat(claimed.pk)
+    heartbeat.start()
+    try:
+        if func is None:
+            raise LookupError(f"No handler registered for job {claimed.name!r}")
+        with transaction.atomic():
+            func(**claimed.payload)
+    except Exception:
+        claimed.last_error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            claimed.status = "failed"
+        else:
+            claimed.status = "pending"
+            claimed.run_at = timezone.now() + backoff(claimed.attempts)
+    else:
+        claimed.status = "done"
+        claimed.last_error = ""
+    finally:
+        heartbeat.stop()
+
+    claimed.duration_ms = (time.perf_counter() - started) * 1000
+    claimed.finished_at = timezone.now()
+    claimed.save(
+        update_fields=[
+            "status",
+            "last_error",
+            "run_at",
+            "duration_ms",
+            "finished_at",
+        ]
+    )
+
+    log = logger.info if claimed.status == "done" else logger.warning
+    log(
+        "Job %s #%d %s in %.1fms (attempt %d/%d, waited %.1fs)",
+        claimed.name,
+        claimed.pk,
+        claimed.status,
+        claimed.duration_ms,
+        claimed.attempts,
+        claimed.max_attempts,
+        waited,
+    )
+    return claimed.status == "done"
@@ -0,0 +1,146 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from apps.jobs import queue
+from apps.jobs.models import Job
+
+
+@queue.job("tests.noop", max_attempts=3)
+def noop(**payload):
+    pass
+
+
+@queue.job("tests.slow")
+def slow(seconds):
+    time.sleep(seconds)
+
+
+def stale():
+    return timezone.now() - queue.STALE_AFTER - timedelta(seconds=1)
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    def test_uses_handler_max_attempts(self):
+        created = queue.enqueue(noop, event_id=1)
+
+        assert created.name == "tests.noop"
+        assert created.payload == {"event_id": 1}
+        assert created.max_attempts == 3
+
+    def test_unique_skips_pending_duplicate(self):
+        first = queue.enqueue(noop, unique=True, event_id=1)
+
+        assert queue.enqueue(noop, unique=True, event_id=1) is None
+        assert queue.enqueue(noop, unique=True, event_id=2) is not None
+        assert Job.objects.filter(payload={"event_id": 1}).get() == first
+
+    def test_unique_enqueues_again_once_running(self):
+        first = queue.enqueue(noop, unique=True, event_id=1)
+        Job.objects.filter(pk=first.pk).update(status="running")
+
+        assert queue.enqueue(noop, unique=True, event_id=1) is not None
+
+    def test_without_unique_allows_duplicates(self):
+        queue.enqueue(noop, event_id=1)
+        queue.enqueue(noop, event_id=1)
+
+        assert Job.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestClaim:
+    def test_claims_oldest_ready_job(self):
+        now = timezone.now()
+        queue.enqueue(noop, run_at=now + timedelta(minutes=5))
+        newer = queue.enqueue(noop, run_at=now - timedelta(minutes=1))
+        older = queue.enqueue(noop, run_at=now - timedelta(minutes=2))
+
+        claimed = queue.claim()
+
+        assert claimed == older
+        older.refresh_from_db()
+        assert older.status == "running"
+        assert older.attempts == 1
+        assert older.started_at == older.heartbeat_at is not None
+        assert queue.claim() == newer
+        assert queue.claim() is None
+
+    def test_filters_by_name(self):
+        queue.enqueue("tests.other")
+        wanted = queue.enqueue(noop)
+
+        assert queue.claim(["tests.noop"]) == wanted
+        assert queue.claim(["tests.noop"]) is None
+
+    def test_skips_locked_rows(self):
+        queue.enqueue(noop)
+
+        with mock.patch.object(
+            Job.objects, "select_for_update", wraps=Job.objects.select_for_update
+        ) as select_for_update:
+            queue.claim()
+
+        select_for_update.assert_called_once_with(skip_locked=True)
+
+    def test_leaves_live_running_job(self):
+        running = queue.enqueue(noop)
+        Job.objects.filter(pk=running.pk).update(
+            status="running", started_at=stale(), heartbeat_at=timezone.now()
+        )
+
+        assert queue.claim() is None
+
+    def test_reclaims_job_with_stale_heartbeat(self):
+        running = queue.enqueue(noop)
+        Job.objects.filter(pk=running.pk).update(
+            status="running", attempts=1, started_at=stale(), heartbeat_at=stale()
+        )
+
+        claimed = queue.claim()
+
+        assert claimed == running
+        assert claimed.attempts == 2
+        assert claimed.heartbeat_at > stale()
+
+    def test_reclaims_stale_job_without_heartbeat(self):
+        # Claimed before heartbeats existed.
+        running = queue.enqueue(noop)
+        Job.objects.filter(pk=running.pk).update(
+            status="running", started_at=stale(), heartbeat_at=None
+        )
+
+        assert queue.claim() == running
+
+
+@pytest.mark.django_db(transaction=True)
+class TestHeartbeat:
+    def test_beats_while_job_runs(self):
+        queue.enqueue(slow, seconds=0.3)
+        claimed = queue.claim()
+        Job.objects.filter(pk=claimed.pk).update(heartbeat_at=stale())
+
+        with mock.patch.object(queue, "HEARTBEAT_INTERVAL", timedelta(milliseconds=50)):
+            assert queue.run(claimed)
+
+        claimed.refresh_from_db()
+        assert claimed.status == "done"
+        assert claimed.heartbeat_at > claimed.started_at
+
+    def test_stops_beating_once_job_is_finished(self):
+        finished = queue.enqueue(noop)
+        Job.objects.filter(pk=finished.pk).update(status="done", heartbeat_at=stale())
+
+        with mock.patch.object(queue, "HEARTBEAT_INTERVAL", timedelta(milliseconds=10)):
+            heartbeat = queue.Heartbeat(finished.pk)
+            heartbeat.start()
+            time.sleep(0.05)
+            heartbeat.stop()
+
+        assert not heartbeat.is_alive()
+        finished.refresh_from_db()
+        assert finished.heartbeat_at < timezone.now() - queue.STALE_AFTER
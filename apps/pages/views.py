@@ -1,7 +1,9 @@
 from django.views.generic import TemplateView
 
+from apps.events.caching import SharedCacheMixin
 
-class HomeView(TemplateView):
+
+class HomeView(SharedCacheMixin, TemplateView):
     template_name = "pages/home.html"
 
 
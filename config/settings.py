@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     "apps.events",
     "apps.bookings",
     "apps.dashboard",
+    "apps.jobs",
     "apps.pages",
 ]
 
@@ -125,6 +126,11 @@ else:
         }
     }
 
+# Cache version keys must be shared by every web and worker process, so
+# deployments point this at dbcache://django_cache (after createcachetable)
+# or a Redis URL. The per-process locmem default only suits runserver.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -153,8 +159,6 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
-
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -177,6 +181,15 @@ else:
     else:
         DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 
+# Django 5.1 dropped DEFAULT_FILE_STORAGE/STATICFILES_STORAGE; STORAGES is the
+# only form it reads.
+STORAGES = {
+    "default": {"BACKEND": DEFAULT_FILE_STORAGE},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -190,6 +203,47 @@ KHALTI_SECRET_KEY = env("KHALTI_SECRET_KEY", default="")
 KHALTI_PUBLIC_KEY = env("KHALTI_PUBLIC_KEY", default="")
 KHALTI_BASE_URL = env("KHALTI_BASE_URL", default="https://api.khalti.com/api/v2")
 
+SIMILARITY_IDF_DRIFT_THRESHOLD = env.float(
+    "SIMILARITY_IDF_DRIFT_THRESHOLD", default=0.2
+)
+SIMILARITY_NEIGHBORS = env.int("SIMILARITY_NEIGHBORS", default=8)
+
+# Approximate candidate search. More tables raise recall, more bits per
+# table shrink buckets (faster, lower recall). Changing either requires
+# `manage.py rebuild_similarity --embeddings`.
+SIMILARITY_ANN_ENABLED = env.bool("SIMILARITY_ANN_ENABLED", default=False)
+SIMILARITY_LSH_TABLES = env.int("SIMILARITY_LSH_TABLES", default=16)
+SIMILARITY_LSH_BITS = env.int("SIMILARITY_LSH_BITS", default=6)
+
+# Numbered listing pages cache their COUNT(*) for this many seconds. Unfiltered
+# listings whose planner estimate reaches LISTING_COUNT_ESTIMATE_MIN rows show
+# the estimate and only count exactly on the last page.
+LISTING_COUNT_CACHE_TTL = env.int("LISTING_COUNT_CACHE_TTL", default=60)
+LISTING_COUNT_ESTIMATE_MIN = env.int("LISTING_COUNT_ESTIMATE_MIN", default=10_000)
+# Explore filter counts (per category, price, date window) per filter state.
+FACET_CACHE_TTL = env.int("FACET_CACHE_TTL", default=60)
+# Anonymous explore/detail responses and rendered event cards. Both are keyed
+# on event and catalog versions, so these only bound memory, not staleness.
+PAGE_CACHE_TTL = env.int("PAGE_CACHE_TTL", default=300)
+FRAGMENT_CACHE_TTL = env.int("FRAGMENT_CACHE_TTL", default=3600)
+# s-maxage on anonymous home/explore/detail responses: how long the nginx
+# micro-cache may reuse one without revalidating; 0 turns that tier off.
+# Browsers always revalidate.
+PAGE_SHARED_MAX_AGE = env.int("PAGE_SHARED_MAX_AGE", default=5)
+# Each process keeps the category list in memory and checks the shared
+# version at most this often, which bounds staleness after another worker
+# adds a category.
+CATEGORY_CACHE_CHECK_INTERVAL = env.float("CATEGORY_CACHE_CHECK_INTERVAL", default=5)
+# On Postgres every cache version bump is also sent over LISTEN/NOTIFY and a
+# listener thread in each web process applies it: in-process caches (the
+# category list, a locmem CACHES) catch up within milliseconds. Costs one
+# extra database connection per process.
+CACHE_INVALIDATION_BUS = env.bool("CACHE_INVALIDATION_BUS", default=True)
+
+# Seconds between runs of the job that moves Event.next_start_date past
+# occurrences that have started.
+EVENT_DATE_ROLL_INTERVAL = env.int("EVENT_DATE_ROLL_INTERVAL", default=300)
+
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -3,12 +3,17 @@ from django.conf import settings
 
 
 @pytest.fixture(scope="session")
-def django_db_setup():
+def django_db_modify_db_settings():
+    from django.db import connections
+
     settings.DATABASES["default"] = {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
         "ATOMIC_REQUESTS": True,
     }
+    # Drop connections configured from the Postgres settings.
+    connections.__dict__.pop("settings", None)
+    connections._connections = type(connections._connections)()
 
 
 @pytest.fixture
@@ -11,6 +11,7 @@ while ! nc -z $HOST $PORT; do
 done
 
 python manage.py migrate --noinput
+python manage.py createcachetable
 python manage.py collectstatic --noinput
 
 if [ "$1" = "runserver" ]; then
@@ -0,0 +1,88 @@
+"""
+Hammer the anonymous pages through nginx and report throughput.
+
+    docker compose up -d
+    python scripts/loadtest.py --url http://localhost:8000 --slug some-event
+
+Each path is run twice: once as an anonymous visitor (eligible for the
+nginx micro-cache) and once with a dummy sessionid cookie, which makes
+nginx bypass the micro-cache so every request reaches Django.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+MODES = {
+    "micro-cache": {},
+    "bypass": {"Cookie": "sessionid=loadtest-bypass"},
+}
+
+
+def worker(url, headers, deadline, timings, statuses, lock):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            with urlopen(Request(url, headers=headers), timeout=30) as response:
+                response.read()
+                status = response.headers.get("X-Micro-Cache") or response.status
+        except HTTPError as exc:
+            status = exc.code
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            timings.append(elapsed)
+            statuses[status] += 1
+
+
+def run(url, headers, concurrency, duration):
+    timings, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker, url, headers, deadline, timings, statuses, lock)
+    return timings, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--slug", help="Event slug to include /event/<slug>/.")
+    parser.add_argument("--paths", nargs="*", default=["/", "/explore/"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    paths = list(args.paths)
+    if args.slug:
+        paths.append(f"/event/{args.slug}/")
+
+    print(
+        f"{'path':<28} {'mode':<12} {'req/s':>8} {'p50 ms':>8} "
+        f"{'p99 ms':>8}  cache status"
+    )
+    for path in paths:
+        url = args.url.rstrip("/") + path
+        rates = {}
+        for mode, headers in MODES.items():
+            timings, statuses = run(url, headers, args.concurrency, args.duration)
+            if len(timings) < 2:
+                print(f"{path:<28} {mode:<12} too few responses")
+                continue
+            rates[mode] = len(timings) / args.duration
+            cuts = statistics.quantiles(timings, n=100)
+            summary = ", ".join(f"{k}={v}" for k, v in statuses.most_common())
+            print(
+                f"{path:<28} {mode:<12} {rates[mode]:>8.0f} {cuts[49]:>8.1f} "
+                f"{cuts[98]:>8.1f}  {summary}"
+            )
+        if len(rates) == 2 and rates["bypass"]:
+            print(f"{'':<28} speedup {rates['micro-cache'] / rates['bypass']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()